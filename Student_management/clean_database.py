@@ -14,7 +14,8 @@ sys.path.insert(0, project_path)
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'exam_portal.settings')
 django.setup()
 
-from exams.models import ExamRecord
+from exams.models import Dataset, ExamRecord
+from exams.views import _records_changed
 
 print("=" * 80)
 print("COMPLETE DATABASE CLEANUP")
@@ -23,7 +24,10 @@ print("=" * 80)
 # Delete ALL records
 count = ExamRecord.objects.count()
 print(f"\n🗑️  Deleting {count} existing records...")
+register_nos = list(ExamRecord.objects.values_list('register_no', flat=True).distinct())
 ExamRecord.objects.all().delete()
+# Drop cached logins and the published snapshot, which still hold the deleted records
+_records_changed(register_nos, Dataset.objects.values_list('id', flat=True), reset=True)
 
 print(f"✅ All records deleted!")
 print(f"📊 Current database: {ExamRecord.objects.count()} records")
@@ -10,7 +10,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 
 # Quick-start development settings - unsuitable for production
-# See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
+# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'django-insecure-your-secret-key-change-in-production'
@@ -67,7 +67,7 @@ WSGI_APPLICATION = 'exam_portal.wsgi.application'
 
 
 # Database
-# https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+# https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
 DATABASES = {
     'default': {
@@ -85,7 +85,7 @@ DATABASES = {
 
 
 # Password validation
-# https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
+# https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -104,7 +104,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 
 # Internationalization
-# https://docs.djangoproject.com/en/4.2/topics/i18n/
+# https://docs.djangoproject.com/en/5.2/topics/i18n/
 
 LANGUAGE_CODE = 'en-us'
 
@@ -116,13 +116,84 @@ USE_TZ = True
 
 
 # Static files (CSS, JavaScript, Images)
-# https://docs.djangoproject.com/en/4.2/howto/static-files/
+# https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Use a shared backend (Redis/Memcached) in production so every worker
+# sees the same student login cache and invalidations.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'exam-portal',
+        # Room for every student's login payload plus throttle buckets
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    }
+}
+
+# Seconds a cached student login payload is kept. Writes invalidate the entries of the
+# students they touch; with the per-process cache above, only in the worker that wrote
+STUDENT_LOGIN_CACHE_TIMEOUT = 6 * 60 * 60
+
+# Fixed-window throttling for student login, kept in the cache: (requests/second, burst),
+# i.e. burst requests per burst/rate-second window. With the per-process cache above the
+# limits apply per worker process; point CACHES at a shared backend to enforce them
+# across workers. The per-IP limit is generous because a campus network shares few
+# public IPs. Set a scope to None to disable it.
+STUDENT_LOGIN_THROTTLE = {
+    'ip': (50, 500),
+    'register_no': (0.2, 5),
+}
+# Where the per-IP limit reads the client address: None for REMOTE_ADDR, or the
+# request.META key of a header set by a trusted reverse proxy, e.g. 'HTTP_X_FORWARDED_FOR'.
+# Behind a proxy REMOTE_ADDR is the proxy itself, putting every student in one bucket.
+STUDENT_LOGIN_IP_HEADER = None
+# Trusted proxies in front of the server; the address this many entries from the right
+# of a comma-separated header is used, since clients can forge the ones further left
+STUDENT_LOGIN_PROXY_COUNT = 1
+
+# Seconds a seat token issued at login stays valid for polling GET /api/student/seat/
+STUDENT_SEAT_TOKEN_MAX_AGE = 12 * 60 * 60
+
+# Serve POST /api/student/login/ with the async view; enable only when running under an
+# ASGI server (see README), where it no longer holds a thread per waiting login
+STUDENT_LOGIN_ASYNC = False
+
+# Read-only seat snapshot served by student login once a dataset is published
+SEAT_SNAPSHOT_PATH = BASE_DIR / 'snapshots' / 'seating.snap'
+
+# Background upload ingest: where uploaded files wait for a worker, and worker
+# threads per server process (jobs for the same dataset still run one at a time)
+INGEST_UPLOAD_DIR = BASE_DIR / 'uploads'
+INGEST_WORKERS = 2
+# How uploads are written when the request does not say: 'batched' (ORM bulk upsert)
+# or 'staging' (staging table plus set-based merge)
+INGEST_METHOD = 'batched'
+# Processes that parse the sheets of a multi-sheet .xlsx upload in parallel (0 = one
+# sheet after another in the ingest worker, streamed with the least memory)
+INGEST_EXCEL_PROCESSES = 0
+# Processes that parse the files of a batch upload in parallel
+INGEST_BATCH_PROCESSES = min(os.cpu_count() or 1, 8)
+
+# Ingest workers run in background threads with no request to report to; their
+# warnings and failures (with tracebacks) go to stderr through the 'exams' logger
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'exams': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 # Default primary key field type
-# https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
+# https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
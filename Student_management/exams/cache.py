@@ -0,0 +1,88 @@
+"""
+Read-through cache for student login lookups.
+
+Entries are keyed by the normalized register number and map each date of
+birth seen for that student to the serialized response payload. Keying on the
+register number alone means a single ``cache.delete`` drops every cached
+payload for a student, which is what the seating and upload views need when
+they change that student's rows.
+
+The active datasets' seating versions are cached as well; they make up the
+ETag of the student seat endpoint. Login entries do not depend on them, so a
+write to one student's rows leaves every other student's entry in place.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Dataset
+
+STUDENT_LOGIN_KEY_PREFIX = 'student_login'
+SEATING_VERSIONS_KEY = 'seating_versions'
+# Short lifetime bounds how long a per-process cache serves an old ETag
+SEATING_VERSIONS_TIMEOUT = 60
+
+
+def _timeout():
+    return getattr(settings, 'STUDENT_LOGIN_CACHE_TIMEOUT', 6 * 60 * 60)
+
+
+def student_login_key(register_no):
+    """Cache key holding the login payloads for one register number."""
+    return f'{STUDENT_LOGIN_KEY_PREFIX}:{register_no}'
+
+
+def get_student_login(register_no, date_of_birth):
+    """Return the cached payload for (register_no, date_of_birth) or None."""
+    entry = cache.get(student_login_key(register_no))
+    if not entry:
+        return None
+    return entry.get(date_of_birth.isoformat())
+
+
+def set_student_login(register_no, date_of_birth, payload):
+    """Store the payload served for (register_no, date_of_birth)."""
+    key = student_login_key(register_no)
+    entry = cache.get(key) or {}
+    entry[date_of_birth.isoformat()] = payload
+    cache.set(key, entry, _timeout())
+
+
+async def aget_student_login(register_no, date_of_birth):
+    """Async variant of get_student_login."""
+    entry = await cache.aget(student_login_key(register_no))
+    if not entry:
+        return None
+    return entry.get(date_of_birth.isoformat())
+
+
+async def aset_student_login(register_no, date_of_birth, payload):
+    """Async variant of set_student_login."""
+    key = student_login_key(register_no)
+    entry = await cache.aget(key) or {}
+    entry[date_of_birth.isoformat()] = payload
+    await cache.aset(key, entry, _timeout())
+
+
+def invalidate_student_logins(register_nos):
+    """Drop cached login payloads for the given register numbers."""
+    keys = {student_login_key(r) for r in register_nos if r}
+    if keys:
+        cache.delete_many(list(keys))
+
+
+def _seating_versions_query():
+    return Dataset.objects.filter(is_active=True).order_by('id').values_list('id', 'seating_version')
+
+
+def get_seating_versions():
+    """(dataset id, seating_version) pairs of the active datasets."""
+    versions = cache.get(SEATING_VERSIONS_KEY)
+    if versions is None:
+        versions = [tuple(pair) for pair in _seating_versions_query()]
+        cache.set(SEATING_VERSIONS_KEY, versions, SEATING_VERSIONS_TIMEOUT)
+    return versions
+
+
+def invalidate_seating_versions():
+    """Forget the cached seating versions after a dataset changed."""
+    cache.delete(SEATING_VERSIONS_KEY)
@@ -0,0 +1,97 @@
+"""
+Streaming reader for .xlsx uploads.
+
+Workbooks are opened with openpyxl in read-only mode, which parses the sheet
+XML as it is iterated instead of building the whole workbook in memory like
+pandas.read_excel does. Every sheet with a header row is read (e.g. one sheet
+per department) and handed over as DataFrames of at most chunk_rows rows, each
+carrying its sheet's own header.
+
+This module deliberately imports nothing from Django, so sheets can be parsed
+by spawned worker processes.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+
+def _open(path):
+    from openpyxl import load_workbook
+
+    return load_workbook(path, read_only=True, data_only=True)
+
+
+def read_sheet(worksheet, chunk_rows):
+    """
+    Yield one read-only worksheet as DataFrames of up to chunk_rows rows.
+
+    The first non-empty row is the header; fully empty rows are skipped.
+    Repeated header names get '.1', '.2', ... appended like pandas does.
+    """
+    import pandas as pd
+
+    # Exported workbooks often carry wrong dimensions; read until the rows run out
+    worksheet.reset_dimensions()
+    header, rows = None, []
+    for values in worksheet.iter_rows(values_only=True):
+        if all(value is None or value == '' for value in values):
+            continue
+        if header is None:
+            header = _header(values)
+            continue
+        # Rows can be shorter or longer than the header
+        values = values[:len(header)]
+        rows.append(values + (None,) * (len(header) - len(values)))
+        if len(rows) >= chunk_rows:
+            yield pd.DataFrame(rows, columns=header)
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows, columns=header)
+
+
+def _header(values):
+    header, seen = [], {}
+    for value in values:
+        name = '' if value is None else str(value).strip()
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        header.append(name)
+    return header
+
+
+def _sheet_frames(path, sheet, chunk_rows):
+    """Process-pool task: a whole sheet's frames."""
+    workbook = _open(path)
+    try:
+        return list(read_sheet(workbook[sheet], chunk_rows))
+    finally:
+        workbook.close()
+
+
+def read_workbook(path, chunk_rows, processes=0):
+    """
+    Yield the DataFrames of every sheet, sheet by sheet in workbook order.
+
+    With processes > 1 and several sheets, the sheets are parsed in parallel
+    by a pool of spawned processes. Each sheet then arrives whole rather than
+    streamed, and every worker opens the workbook itself, so this only pays
+    off for large multi-sheet workbooks on a machine with spare cores.
+    """
+    workbook = _open(path)
+    try:
+        sheets = workbook.sheetnames
+        if processes <= 1 or len(sheets) < 2:
+            for sheet in sheets:
+                yield from read_sheet(workbook[sheet], chunk_rows)
+            return
+    finally:
+        workbook.close()
+
+    # Spawned, not forked: the caller is usually a threaded server process
+    with ProcessPoolExecutor(
+        max_workers=min(processes, len(sheets)), mp_context=multiprocessing.get_context('spawn')
+    ) as executor:
+        for frames in executor.map(_sheet_frames, [path] * len(sheets), sheets, [chunk_rows] * len(sheets)):
+            yield from frames
@@ -0,0 +1,726 @@
+"""
+Bulk ingest of uploaded exam records.
+
+read_upload reads an uploaded file as a stream of pandas DataFrames and
+parse_upload maps each one onto ExamRecord fields with whole-column
+operations. RecordIngest matches rows against the dataset's
+(register_no, course_code) keys and writes them as batched bulk_create
+upserts on the table's unique key, following the merge rules upload_csv has
+always used when a row matches an existing record. StagedIngest applies the
+same rules by loading the rows into a staging table and merging them with
+set-based SQL. read_uploads parses several files at once and folds them into
+one row per key. hall_seats and upsert_rooms infer exam rooms from the halls
+of the parsed rows.
+"""
+import logging
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from .excel import read_workbook
+from .models import ExamRecord, Room, StagedRecord, content_hash
+
+logger = logging.getLogger(__name__)
+
+UPDATE_FIELDS = list(ExamRecord.CONTENT_FIELDS)
+FIELDS = {field.name: field for field in ExamRecord._meta.get_fields() if field.concrete}
+REGISTER_NO_VALIDATORS = FIELDS['register_no'].validators
+DEFAULT_BATCH_SIZE = 1000
+# Rows per DataFrame when streaming a CSV upload
+UPLOAD_CHUNK_ROWS = 20000
+
+# Accepted upload headers per field, matched case-insensitively in this order
+UPLOAD_COLUMN_ALIASES = {
+    'register_no': ['register-no', 'register no', 'reg no', 'regno', 'roll no', 'rollno', 'registerno'],
+    'student_name': ['student name', 'name', 'studentname'],
+    'course_code': ['course code', 'coursecode', 'code'],
+    'course_title': ['course title', 'coursetitle', 'title', 'course name'],
+    'exam_date': ['exam date', 'examdate', 'date'],
+    'exam_session': ['exam session', 'examsession', 'session'],
+    'date_of_birth': ['date of birth', 'dob', 'dateofbirth', 'birth date'],
+    'exam_hall_number': ['examhallnumber', 'exam hall number', 'hall number', 'hallnumber', 'hall no', 'exam hall', 'hall'],
+    'exam_seat_number': ['examseatnumber', 'exam seat number', 'seat number', 'seatnumber', 'seat no', 'exam seat', 'seat'],
+}
+UPLOAD_REQUIRED_FIELDS = ('register_no', 'student_name', 'course_code')
+EXAM_DATE_FORMATS = ['%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y', '%d/%m/%Y']
+DATE_OF_BIRTH_FORMATS = EXAM_DATE_FORMATS + ['%d/%m/%y']
+# ExamRecord's unique key, which every ingest path upserts on
+UNIQUE_FIELDS = ['dataset', 'register_no', 'course_code']
+# Rows staged and merged per set-based statement pair
+STAGING_BATCH_SIZE = 20000
+
+
+def resolve_columns(columns, aliases=UPLOAD_COLUMN_ALIASES):
+    """Map each field to the first uploaded column matching one of its aliases (None if absent)."""
+    by_name = {}
+    for column in columns:
+        by_name.setdefault(str(column).strip().lower(), column)
+    return {
+        field: next((by_name[name] for name in names if name in by_name), None)
+        for field, names in aliases.items()
+    }
+
+
+def _text_column(series):
+    """Stripped strings with blanks as NA; whole numbers from numeric columns lose their '.0'."""
+    import pandas as pd
+
+    if pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+        series = series.astype('Int64')
+    text = series.astype('string').str.strip()
+    return text.mask(text == '')
+
+
+def _objects(series):
+    """Object column with None for every missing value, ready for the ORM."""
+    return series.astype(object).where(series.notna(), None)
+
+
+def _date_column(series, formats):
+    """Parse a column against each format in turn; only the leftovers fall back to per-value inference."""
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        parsed = series
+    else:
+        text = _text_column(series)
+        parsed = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+        for fmt in formats:
+            todo = parsed.isna() & text.notna()
+            if not todo.any():
+                break
+            parsed[todo] = _in_range(pd.to_datetime(text[todo], format=fmt, errors='coerce'))
+        # Excel date cells in text columns and other spellings, inferred per value
+        leftovers = parsed.isna() & text.notna()
+        if leftovers.any():
+            parsed[leftovers] = _in_range(pd.to_datetime(series[leftovers], format='mixed', errors='coerce'))
+    return _objects(parsed.dt.date)
+
+
+def _in_range(parsed):
+    """Drop dates outside the datetime64[ns] range (e.g. '15th Dec' inferred as year 1) as unparseable."""
+    import pandas as pd
+
+    return parsed.where((parsed >= pd.Timestamp.min) & (parsed <= pd.Timestamp.max))
+
+
+def _register_no_error(register_no):
+    """Why a register number would be rejected by the model's validators, or None."""
+    for validator in REGISTER_NO_VALIDATORS:
+        try:
+            validator(register_no)
+        except ValidationError as e:
+            return ' '.join(e.messages)
+    return None
+
+
+def parse_upload(df, aliases=UPLOAD_COLUMN_ALIASES, required=UPLOAD_REQUIRED_FIELDS):
+    """
+    Map an uploaded DataFrame onto a frame with one column per ExamRecord field.
+
+    Headers are resolved once per frame and every field is normalized as a
+    whole column: text is stripped (register numbers upper-cased) and dates
+    are tried against EXAM_DATE_FORMATS / DATE_OF_BIRTH_FORMATS. Blank or
+    unparseable values become None; rows missing a required field, or whose
+    register number fails the model's validators, are dropped. Returns
+    (frame, rejected), rejected being how many rows were dropped.
+    """
+    import pandas as pd
+
+    columns = resolve_columns(df.columns, aliases)
+    fields = {}
+    for field, column in columns.items():
+        if column is None:
+            fields[field] = pd.Series([None] * len(df), index=df.index, dtype=object)
+        elif field == 'exam_date':
+            fields[field] = _date_column(df[column], EXAM_DATE_FORMATS)
+        elif field == 'date_of_birth':
+            fields[field] = _date_column(df[column], DATE_OF_BIRTH_FORMATS)
+        elif field == 'register_no':
+            fields[field] = _objects(_text_column(df[column]).str.upper())
+        else:
+            fields[field] = _objects(_text_column(df[column]))
+
+    keep = pd.concat([fields[field].notna() for field in required], axis=1).all(axis=1)
+    # Validated once per distinct register number rather than per row
+    invalid = {value for value in fields['register_no'].dropna().unique() if _register_no_error(value)}
+    if invalid:
+        keep &= ~fields['register_no'].isin(invalid)
+    rejected = int((~keep).sum())
+    if rejected:
+        fields = {name: values[keep] for name, values in fields.items()}
+    return pd.DataFrame(fields), rejected
+
+
+def parsed_rows(parsed):
+    """RecordIngest row dicts for a parse_upload frame."""
+    # Plain lists zipped into dicts: far cheaper than DataFrame.to_dict('records')
+    names = list(parsed.columns)
+    return [dict(zip(names, values)) for values in zip(*(parsed[name].tolist() for name in names))]
+
+
+def hall_seats(parsed, halls=None):
+    """
+    Highest numeric seat per hall of a parse_upload frame, found with one
+    group-by and merged into halls (hall -> seat, 0 when no seat is a number).
+    """
+    import pandas as pd
+
+    halls = {} if halls is None else halls
+    seats = parsed['exam_seat_number'].astype('string')
+    numbers = pd.to_numeric(seats.where(seats.str.fullmatch('[0-9]+', na=False)), errors='coerce').fillna(0)
+    # Rows without a hall drop out of the group-by
+    for hall, seat in numbers.groupby(parsed['exam_hall_number'], sort=False).max().items():
+        halls[hall] = max(halls.get(hall, 0), int(seat))
+    return halls
+
+
+def upsert_rooms(halls):
+    """
+    Create rooms for uploaded halls (hall -> highest seat, see hall_seats) or
+    grow their capacity, with the Room table read once and one
+    bulk_create/bulk_update. Returns how many rooms were created.
+    """
+    # MySQL compares room numbers case-insensitively, so match them that way everywhere
+    rooms = {room.room_number.lower(): room for room in Room.objects.all()}
+    new_rooms, grown = {}, {}
+    for hall_name, max_seat in halls.items():
+        if not hall_name or hall_name.lower() == 'pending':
+            continue
+        key = hall_name.lower()
+        room = rooms.get(key)
+        if room is None:
+            # Default capacity to at least 30 if max_seat is small or 0, otherwise use max_seat
+            room = new_rooms.setdefault(key, Room(room_number=hall_name, capacity=30, is_available=True))
+            room.capacity = max(room.capacity, max_seat)
+        elif max_seat > room.capacity:
+            # Update capacity if new data suggests larger room
+            room.capacity = max_seat
+            grown[key] = room
+
+    # A concurrent upload may have just created the same room; it keeps its row
+    Room.objects.bulk_create(new_rooms.values(), ignore_conflicts=True)
+    if grown:
+        Room.objects.bulk_update(grown.values(), ['capacity'])
+    return len(new_rooms)
+
+
+def read_upload(path, filename, chunk_rows=UPLOAD_CHUNK_ROWS, processes=0):
+    """
+    Read an uploaded CSV or Excel file as a stream of DataFrames.
+
+    CSV files are read chunk_rows rows at a time and .xlsx workbooks are
+    streamed sheet by sheet with openpyxl (see exams.excel; processes > 1
+    parses multi-sheet workbooks in parallel), so memory does not grow with
+    the file. Parse errors surface while iterating. Legacy .xls workbooks
+    are read whole by pandas.
+    """
+    import pandas as pd
+
+    if filename.endswith('.csv'):
+        with pd.read_csv(path, chunksize=chunk_rows) as reader:
+            yield from reader
+    elif filename.endswith('.xlsx'):
+        yield from read_workbook(path, chunk_rows, processes)
+    else:
+        yield pd.read_excel(path)
+
+
+def _coerce(row):
+    """Coerce a row to the stored types (e.g. numeric seat columns) so unchanged rows compare equal."""
+    return {name: value if value is None else FIELDS[name].to_python(value) for name, value in row.items()}
+
+
+def _new_record(dataset, row):
+    """An unsaved ExamRecord for an uploaded row with no existing match."""
+    return ExamRecord(
+        dataset=dataset,
+        register_no=row['register_no'],
+        student_name=row['student_name'] or 'Unknown',
+        course_code=row['course_code'],
+        course_title=row['course_title'] or 'Unknown',
+        exam_date=row['exam_date'] or timezone.now().date(),
+        exam_session=row['exam_session'] or 'FN',
+        exam_hall_number=row['exam_hall_number'] or 'Pending',
+        exam_seat_number=row['exam_seat_number'] or 'Pending',
+        date_of_birth=row['date_of_birth'],
+    )
+
+
+def _merge_row(record, row):
+    """Apply an uploaded row to a record it matched; blank values keep the stored ones."""
+    record.student_name = row['student_name'] or record.student_name
+    record.course_title = row['course_title'] or record.course_title
+    if row['exam_date']:
+        record.exam_date = row['exam_date']
+    if row['exam_session']:
+        record.exam_session = row['exam_session']
+    if row['date_of_birth']:
+        record.date_of_birth = row['date_of_birth']
+    # A new seat without a hall resets the hall to 'Pending', clearing stale system values
+    if row['exam_seat_number']:
+        record.exam_seat_number = row['exam_seat_number']
+        record.exam_hall_number = row['exam_hall_number'] or 'Pending'
+    elif row['exam_hall_number']:
+        record.exam_hall_number = row['exam_hall_number']
+
+
+def _record_hash(record):
+    return content_hash(getattr(record, field) for field in UPDATE_FIELDS)
+
+
+def _upload_hash(rows):
+    """
+    row_hash a record ends up with after rows for its key, or None when that
+    depends on its stored values (a blank cell keeps the stored one).
+    """
+    if len(rows) == 1:
+        values = [rows[0][field] for field in UPDATE_FIELDS]
+    else:
+        staged = next(iter(fold_rows(rows).values()))
+        values = [getattr(staged, field) for field in UPDATE_FIELDS]
+    if any(value is None for value in values):
+        return None
+    return content_hash(values)
+
+
+def _upsert(records):
+    """
+    Insert records, or overwrite the content of those whose key is already
+    stored, in one INSERT ... ON CONFLICT (ON DUPLICATE KEY on MySQL) per batch.
+    """
+    # MySQL upserts on whichever unique key conflicts and takes no target
+    unique_fields = UNIQUE_FIELDS if connection.features.supports_update_conflicts_with_target else None
+    ExamRecord.objects.bulk_create(
+        records, update_conflicts=True, unique_fields=unique_fields, update_fields=UPDATE_FIELDS + ['row_hash']
+    )
+
+
+def _detached(record):
+    """Unsaved copy of a stored record, written through _upsert by its key instead of its primary key."""
+    return ExamRecord(**{
+        field.attname: getattr(record, field.attname) for field in ExamRecord._meta.concrete_fields if not field.primary_key
+    })
+
+
+def fold_rows(rows, folded=None):
+    """
+    Fold rows into one per (register_no, course_code) key, in order.
+
+    Each key maps to a namespace of UPDATE_FIELDS built with the upload merge
+    rules, where None means "keep the stored value". Applying a folded row to a
+    record has the same effect as applying its rows one by one, so folded
+    rows can be folded again and fed to RecordIngest/StagedIngest as rows.
+    """
+    folded = {} if folded is None else folded
+    for row in rows:
+        key = (row['register_no'], row['course_code'])
+        if key not in folded:
+            folded[key] = SimpleNamespace(**dict.fromkeys(UPDATE_FIELDS))
+        _merge_row(folded[key], row)
+    return folded
+
+
+def folded_rows(folded):
+    """Row dicts for a fold_rows result."""
+    return (
+        dict(vars(staged), register_no=register_no, course_code=course_code)
+        for (register_no, course_code), staged in folded.items()
+    )
+
+
+def fold_upload(path, filename, chunk_rows=UPLOAD_CHUNK_ROWS):
+    """Parse one uploaded file and fold it; returns (folded, hall_seats, rows read, rows rejected)."""
+    folded, halls, rows_read, rejected = {}, {}, 0, 0
+    for df in read_upload(path, filename, chunk_rows):
+        rows_read += len(df)
+        parsed, dropped = parse_upload(df)
+        rejected += dropped
+        fold_rows(parsed_rows(parsed), folded)
+        hall_seats(parsed, halls)
+    return folded, halls, rows_read, rejected
+
+
+def read_uploads(files, processes=0):
+    """
+    Parse several uploads, given as (path, filename) pairs, into one row per key.
+
+    Later files win like consecutive uploads would. With processes > 1 the
+    files are parsed in parallel by a pool of spawned processes (each sets
+    Django up once) and only their folded rows travel back. Returns
+    (rows, highest seat per hall, rows read, rows rejected by parse_upload).
+    """
+    if processes > 1 and len(files) > 1:
+        import django
+
+        # Spawned, not forked: the caller is usually a threaded server process
+        executor = ProcessPoolExecutor(
+            max_workers=min(processes, len(files)),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        )
+        with executor:
+            results = list(executor.map(fold_upload, *zip(*files)))
+    else:
+        results = [fold_upload(path, filename) for path, filename in files]
+
+    merged, halls, rows_read, rejected = {}, {}, 0, 0
+    for folded, file_halls, count, dropped in results:
+        rows_read += count
+        rejected += dropped
+        for hall, seat in file_halls.items():
+            halls[hall] = max(halls.get(hall, 0), seat)
+        if merged:
+            fold_rows(folded_rows(folded), merged)
+        else:
+            merged = folded
+    return list(folded_rows(merged)), halls, rows_read, rejected
+
+
+class RecordIngest:
+    """
+    Batched upsert of uploaded rows into one dataset.
+
+    Rows are dicts with the ExamRecord field names (register_no, student_name,
+    course_code, course_title, exam_date, exam_session, date_of_birth,
+    exam_hall_number, exam_seat_number), already parsed; blank values are
+    None. Call add() per row and finish() once; run both inside one
+    transaction.atomic() block, or call flush() before each commit when the
+    rows are spread over several transactions.
+
+    With preload=False the dataset's keys are not held in memory; each batch
+    looks up its own matches instead, so memory grows with the number of
+    distinct students (register_nos) rather than with the rows streamed through.
+
+    Rows that would leave a record as it is are not written: when a row fills
+    every field its hash is compared with the record's row_hash, otherwise the
+    merged values are compared field by field. They count as unchanged, and
+    only students whose records changed end up in register_nos.
+    """
+
+    def __init__(self, dataset, batch_size=DEFAULT_BATCH_SIZE, preload=True):
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.started = time.perf_counter()
+        self.keys = None
+        if preload:
+            # Lowest primary key wins for keys duplicated in the table, like .first() did
+            self.keys = {
+                (register_no, course_code): pk
+                for pk, register_no, course_code in ExamRecord.objects.filter(dataset=dataset)
+                .order_by('-record').values_list('record', 'register_no', 'course_code')
+            }
+        self.batch = {}
+        self.batch_rows = 0
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.register_nos = set()
+
+    def add(self, row):
+        """Queue one row, flushing when the batch is full."""
+        row = _coerce(row)
+        self.batch.setdefault((row['register_no'], row['course_code']), []).append(row)
+        self.batch_rows += 1
+        self.rows += 1
+        if self.batch_rows >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the queued rows with one bulk upsert."""
+        if not self.batch:
+            return
+        batch, self.batch, self.batch_rows = self.batch, {}, 0
+        existing = self._existing_records(batch)
+
+        creates, updates, changed = [], [], []
+        for key, rows in batch.items():
+            record = existing.get(key)
+            if record is None:
+                record = _new_record(self.dataset, rows[0])
+                creates.append((key, record, rows))
+                for row in rows[1:]:
+                    _merge_row(record, row)
+                record.row_hash = _record_hash(record)
+                continue
+            if record.row_hash is not None and record.row_hash == _upload_hash(rows):
+                # The record already holds exactly what these rows would write
+                updates.append((key, record, rows, False))
+                continue
+            original = [getattr(record, field) for field in UPDATE_FIELDS]
+            for row in rows:
+                _merge_row(record, row)
+            # Only rewrite the rows the upload actually changed
+            fields = {f for f, value in zip(UPDATE_FIELDS, original) if getattr(record, f) != value}
+            updates.append((key, record, rows, bool(fields)))
+            row_hash = _record_hash(record)
+            if row_hash != record.row_hash:
+                # Also fills in hashes that are missing, e.g. for records from before row_hash
+                record.row_hash = row_hash
+                fields.add('row_hash')
+            if fields:
+                changed.append(record)
+
+        try:
+            with transaction.atomic():
+                # New keys and changed records go out together; the unique key decides which is which
+                _upsert([record for _, record, _ in creates] + [_detached(record) for record in changed])
+        except (DatabaseError, TypeError, ValueError):
+            # One bad row fails the whole statement; retry row by row to isolate it
+            creates = [item for item in creates if self._save_one(*item, create=True)]
+            changed = set(changed)
+            updates = [
+                item for item in updates
+                if item[1] not in changed or self._save_one(*item[:3], create=False)
+            ]
+
+        for key, record, rows in creates:
+            if self.keys is not None:
+                self.keys[key] = record.pk
+            self.created += 1
+            self.updated += len(rows) - 1
+            self._track(rows)
+        for key, record, rows, modified in updates:
+            if modified:
+                self.updated += len(rows)
+                self._track(rows)
+            else:
+                self.unchanged += len(rows)
+
+    def finish(self):
+        """Flush the last batch and return the ingest summary."""
+        self.flush()
+        elapsed = time.perf_counter() - self.started
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'failed': self.failed,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(self.rows / elapsed, 1) if elapsed else None,
+        }
+
+    def _existing_records(self, batch):
+        """Stored records matching the batch keys, by key."""
+        if self.keys is None:
+            records = ExamRecord.objects.filter(
+                dataset=self.dataset, register_no__in={register_no for register_no, _ in batch}
+            ).order_by('-record')
+            return {(r.register_no, r.course_code): r for r in records if (r.register_no, r.course_code) in batch}
+        self._resolve_created_keys(batch)
+        records = ExamRecord.objects.in_bulk([self.keys[key] for key in batch if self.keys.get(key)])
+        return {key: records[self.keys[key]] for key in batch if self.keys.get(key) in records}
+
+    def _resolve_created_keys(self, batch):
+        """Fill in primary keys of records created by earlier batches (MySQL does not return them)."""
+        missing = [key for key in batch if key in self.keys and self.keys[key] is None]
+        if not missing:
+            return
+        found = ExamRecord.objects.filter(
+            dataset=self.dataset, register_no__in={register_no for register_no, _ in missing}
+        ).order_by('record').values_list('record', 'register_no', 'course_code')
+        for pk, register_no, course_code in found:
+            if (register_no, course_code) in self.keys and self.keys[(register_no, course_code)] is None:
+                self.keys[(register_no, course_code)] = pk
+        # Still unresolved means a failed row; treat the key as new again
+        for key in missing:
+            if self.keys[key] is None:
+                del self.keys[key]
+
+    def _save_one(self, key, record, rows, create):
+        try:
+            with transaction.atomic():
+                if create:
+                    record.pk = None
+                    _upsert([record])
+                else:
+                    record.save()
+            return True
+        except (DatabaseError, TypeError, ValueError) as e:
+            logger.warning('Error ingesting %s / %s: %s', key[0], key[1], e)
+            self.failed += len(rows)
+            return False
+
+    def _track(self, rows):
+        self.register_nos.update(row['register_no'] for row in rows)
+
+
+def _distinct(a, b):
+    """Null-safe SQL test that two expressions differ, compared case- and space-sensitively like Python."""
+    if connection.vendor == 'mysql':
+        return f"NOT (BINARY {a} <=> BINARY {b})"
+    if connection.vendor == 'sqlite':
+        return f"{a} IS NOT {b}"
+    return f"{a} IS DISTINCT FROM {b}"
+
+
+class StagedIngest(RecordIngest):
+    """
+    RecordIngest that merges through the ExamRecordStaging table.
+
+    Each flush folds duplicate keys with the usual merge rules, loads the
+    result into the staging table with one executemany, then merges it into
+    ExamRecord with two set-based statements: an UPDATE joined to the staged
+    rows and an INSERT ... SELECT of all of them, whose conflict clause lets
+    the unique key drop the ones already stored. Blank staged values keep the
+    stored ones. The UPDATE only touches records whose merged values differ
+    from the stored ones; the rest count as unchanged. Staged rows that fill
+    every field carry their row_hash, which the written records take.
+    If the merge fails, the rows are replayed through the batched ORM path,
+    which isolates the bad ones.
+    """
+
+    def __init__(self, dataset, batch_size=STAGING_BATCH_SIZE):
+        super().__init__(dataset, batch_size=batch_size, preload=False)
+        self.load = uuid.uuid4().hex
+        self.pending = []
+
+    def add(self, row):
+        """Queue one row, merging when the batch is full."""
+        self.pending.append(_coerce(row))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Stage and merge the queued rows."""
+        if not self.pending:
+            return
+        rows, self.pending = self.pending, []
+        try:
+            with transaction.atomic():
+                created, unchanged = self._merge(rows)
+        except DatabaseError:
+            logger.exception('Staged merge failed, falling back to batched upsert')
+            for i in range(0, len(rows), DEFAULT_BATCH_SIZE):
+                for row in rows[i:i + DEFAULT_BATCH_SIZE]:
+                    self.batch.setdefault((row['register_no'], row['course_code']), []).append(row)
+                self.rows += min(DEFAULT_BATCH_SIZE, len(rows) - i)
+                RecordIngest.flush(self)
+            return
+        kept = [row for row in rows if (row['register_no'], row['course_code']) in unchanged]
+        self.rows += len(rows)
+        self.created += created
+        self.unchanged += len(kept)
+        self.updated += len(rows) - created - len(kept)
+        self._track([row for row in rows if (row['register_no'], row['course_code']) not in unchanged])
+
+    def _merge(self, rows):
+        """
+        Stage rows and merge them into ExamRecord. Returns how many records
+        were created and the keys of the records the rows left unchanged.
+        """
+        folded = fold_rows(rows)
+
+        ops = connection.ops
+        staging = StagedRecord._meta
+        staged_fields = ['load', 'register_no', 'course_code'] + UPDATE_FIELDS + ['row_hash']
+        dates = {'exam_date', 'date_of_birth'}
+        values = []
+        for (register_no, course_code), staged in folded.items():
+            row = [self.load, register_no, course_code]
+            content = [getattr(staged, field) for field in UPDATE_FIELDS]
+            for field, value in zip(UPDATE_FIELDS, content):
+                row.append(ops.adapt_datefield_value(value) if field in dates else value)
+            row.append(None if None in content else content_hash(content))
+            values.append(row)
+
+        q = ops.quote_name
+        table, staging_table = q(ExamRecord._meta.db_table), q(staging.db_table)
+        # ExamRecord columns bare (SET targets) and table-qualified, staging columns via alias s
+        column = {field: q(FIELDS[field].column) for field in FIELDS}
+        stored = {field: f'{table}.{name}' for field, name in column.items()}
+        new = {field: f's.{q(staging.get_field(field).column)}' for field in staged_fields}
+
+        keep_stored = ['student_name', 'course_title', 'exam_date', 'exam_session', 'date_of_birth', 'exam_seat_number']
+        # The value each column takes when a staged row is merged into its record
+        merged = {f: f"COALESCE({new[f]}, {stored[f]})" for f in keep_stored}
+        # A new seat without a hall resets the hall to 'Pending', like _merge_row
+        merged['exam_hall_number'] = (
+            f"CASE WHEN {new['exam_seat_number']} IS NOT NULL "
+            f"THEN COALESCE({new['exam_hall_number']}, 'Pending') "
+            f"ELSE COALESCE({new['exam_hall_number']}, {stored['exam_hall_number']}) END"
+        )
+        assignments = [f"{column[f]} = {value}" for f, value in merged.items()]
+        # Staged rows with blanks have no hash; the records they change are rehashed below
+        assignments.append(f"{column['row_hash']} = {new['row_hash']}")
+        matches = f"{stored['register_no']} = {new['register_no']} AND {stored['course_code']} = {new['course_code']}"
+        # Compared column by column, so rows with blank cells are recognized as unchanged too
+        differs = f"({' OR '.join(_distinct(value, stored[f]) for f, value in merged.items())})"
+        # Same defaults as _new_record for the keys with no stored record
+        inserted = {
+            'dataset': '%s',
+            'register_no': new['register_no'],
+            'student_name': f"COALESCE({new['student_name']}, 'Unknown')",
+            'course_code': new['course_code'],
+            'course_title': f"COALESCE({new['course_title']}, 'Unknown')",
+            'exam_date': f"COALESCE({new['exam_date']}, %s)",
+            'exam_session': f"COALESCE({new['exam_session']}, 'FN')",
+            'exam_hall_number': f"COALESCE({new['exam_hall_number']}, 'Pending')",
+            'exam_seat_number': f"COALESCE({new['exam_seat_number']}, 'Pending')",
+            'date_of_birth': new['date_of_birth'],
+            'change_version': '0',
+            'row_hash': new['row_hash'],
+        }
+
+        if connection.vendor == 'mysql':
+            # Conflicting keys are left as they are; MySQL has no DO NOTHING
+            on_conflict = f"ON DUPLICATE KEY UPDATE {table}.{column['record']} = {table}.{column['record']}"
+        else:
+            on_conflict = f"ON CONFLICT ({', '.join(column[f] for f in UNIQUE_FIELDS)}) DO NOTHING"
+
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {staging_table} ({', '.join(q(f) for f in staged_fields)}) "
+                f"VALUES ({', '.join(['%s'] * len(staged_fields))})",
+                values,
+            )
+            cursor.execute(
+                f"SELECT {new['register_no']}, {new['course_code']} FROM {staging_table} s "
+                f"JOIN {table} ON {matches} "
+                f"WHERE {new['load']} = %s AND {stored['dataset']} = %s AND NOT {differs}",
+                [self.load, self.dataset.id],
+            )
+            unchanged = set(cursor.fetchall())
+            if connection.vendor == 'mysql':
+                cursor.execute(
+                    f"UPDATE {table} JOIN {staging_table} s ON {matches} "
+                    f"SET {', '.join(f'{table}.{assignment}' for assignment in assignments)} "
+                    f"WHERE {new['load']} = %s AND {stored['dataset']} = %s AND {differs}",
+                    [self.load, self.dataset.id],
+                )
+            else:
+                cursor.execute(
+                    f"UPDATE {table} SET {', '.join(assignments)} FROM {staging_table} s "
+                    f"WHERE {new['load']} = %s AND {stored['dataset']} = %s AND {matches} AND {differs}",
+                    [self.load, self.dataset.id],
+                )
+            # Rows matched by the UPDATE (MySQL counts found rather than changed rows, so this holds there too)
+            updated = cursor.rowcount
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(column[f] for f in inserted)}) "
+                f"SELECT {', '.join(inserted.values())} FROM {staging_table} s "
+                f"WHERE {new['load']} = %s {on_conflict}",
+                [self.dataset.id, ops.adapt_datefield_value(timezone.now().date()), self.load],
+            )
+            # Staged keys the UPDATE found or skipped as unchanged were stored already; the rest are new
+            created = len(folded) - updated - len(unchanged)
+            # Hash the matched records left without one (partly filled rows, or stored before row_hash)
+            cursor.execute(
+                f"SELECT {stored['record']}, {', '.join(stored[f] for f in UPDATE_FIELDS)} "
+                f"FROM {table} JOIN {staging_table} s ON {matches} "
+                f"WHERE {new['load']} = %s AND {stored['dataset']} = %s AND {stored['row_hash']} IS NULL",
+                [self.load, self.dataset.id],
+            )
+            rehashed = [ExamRecord(record=pk, row_hash=content_hash(values)) for pk, *values in cursor.fetchall()]
+            cursor.execute(f"DELETE FROM {staging_table} WHERE {q('load')} = %s", [self.load])
+        ExamRecord.objects.bulk_update(rehashed, ['row_hash'], batch_size=DEFAULT_BATCH_SIZE)
+        return created, unchanged
@@ -0,0 +1,292 @@
+"""
+Background ingest of uploaded files.
+
+upload_csv stores the file under INGEST_UPLOAD_DIR, records an IngestJob and
+hands its id to a thread pool in the same process, so the request returns at
+once. A worker commits the file chunk by chunk and records its progress on the
+job row in the same transaction as the rows. A failed job keeps its file, and
+a retry resumes after the rows that were already committed. Jobs for one
+dataset run one at a time, in upload order.
+
+A file identical to the last one uploaded into a dataset is not queued at all
+while nothing else has changed the dataset since: its job is recorded as
+succeeded and skipped. Rows are only written where their content changed
+(see RecordIngest).
+
+A batch upload keeps its files in one directory and is ingested by
+ingest_files: the files are parsed in parallel, merged in memory and written
+in a single transaction, so it succeeds or fails as a whole.
+"""
+import hashlib
+import logging
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .ingest import (
+    RecordIngest, StagedIngest, hall_seats, parse_upload, parsed_rows, read_upload, read_uploads, upsert_rooms,
+)
+from .models import Dataset, IngestJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+CLAIM_ATTEMPTS = 5
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def upload_dir():
+    """Directory uploaded files wait in until their job succeeds."""
+    default = Path(settings.BASE_DIR) / 'uploads'
+    return Path(getattr(settings, 'INGEST_UPLOAD_DIR', default))
+
+
+def create_job(dataset, uploaded_file, method=IngestJob.BATCHED):
+    """
+    Store an uploaded file and queue an IngestJob for it, or record a skipped
+    job when the file repeats the dataset's last upload and the dataset has
+    not changed since.
+    """
+    directory = upload_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{uuid.uuid4().hex}{Path(uploaded_file.name).suffix.lower()}'
+    digest = hashlib.sha256()
+    with open(path, 'wb') as f:
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+            f.write(chunk)
+    content_hash = digest.hexdigest()
+
+    unchanged = Dataset.objects.filter(
+        id=dataset.id, upload_hash=content_hash, upload_hash_version=F('seating_version')
+    ).exists()
+    if unchanged:
+        path.unlink()
+        now = timezone.now()
+        return IngestJob.objects.create(
+            dataset=dataset, filename=uploaded_file.name, path=str(path), method=method, content_hash=content_hash,
+            status=IngestJob.SUCCEEDED, skipped=True, started_at=now, finished_at=now,
+        )
+
+    job = IngestJob.objects.create(
+        dataset=dataset, filename=uploaded_file.name, path=str(path), method=method, content_hash=content_hash
+    )
+    submit(job.id)
+    return job
+
+
+def create_batch_job(dataset, uploaded_files, method=IngestJob.BATCHED):
+    """Store several uploaded files in one directory and queue a single IngestJob for them."""
+    directory = upload_dir() / uuid.uuid4().hex
+    directory.mkdir(parents=True)
+    # Numbered names keep the upload order, which decides which file wins a conflict
+    for index, uploaded_file in enumerate(uploaded_files):
+        with open(directory / f'{index:04d}{Path(uploaded_file.name).suffix.lower()}', 'wb') as f:
+            for chunk in uploaded_file.chunks():
+                f.write(chunk)
+    filename = ', '.join(uploaded_file.name for uploaded_file in uploaded_files)
+    job = IngestJob.objects.create(
+        dataset=dataset, filename=filename[:255], path=str(directory), method=method
+    )
+    submit(job.id)
+    return job
+
+
+def submit(job_id):
+    """Run a queued job on this process's worker pool once the current transaction commits."""
+    transaction.on_commit(lambda: _pool().submit(run_job, job_id))
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'INGEST_WORKERS', DEFAULT_WORKERS),
+                thread_name_prefix='ingest',
+            )
+        return _executor
+
+
+def run_job(job_id, chain=True):
+    """
+    Run one queued job to completion.
+
+    Does nothing if the job is no longer queued or another job of its dataset
+    is running; that job starts the next queued one when it finishes (unless
+    chain is False). A job that cannot be claimed stays queued for
+    run_ingest_jobs.
+    """
+    try:
+        job = None
+        for attempt in range(CLAIM_ATTEMPTS):
+            try:
+                job = _claim(job_id)
+                break
+            except DatabaseError as e:
+                # Typically a lock still held by the request that queued the job
+                logger.warning('Claiming ingest job %s failed (attempt %s): %s', job_id, attempt + 1, e)
+                time.sleep(0.2 * (attempt + 1))
+        if job is None:
+            return
+        try:
+            version = _ingest(job)
+        except Exception as e:
+            logger.exception('Ingest job %s failed', job.id)
+            IngestJob.objects.filter(id=job.id).update(
+                status=IngestJob.FAILED, error=str(e), finished_at=timezone.now()
+            )
+        else:
+            IngestJob.objects.filter(id=job.id).update(status=IngestJob.SUCCEEDED, finished_at=timezone.now())
+            if job.content_hash and version is not None:
+                # Remembered with the version the job's own last write committed, so any
+                # write landing since then keeps the next identical upload from being skipped
+                Dataset.objects.filter(id=job.dataset_id).update(
+                    upload_hash=job.content_hash, upload_hash_version=version
+                )
+            if Path(job.path).is_dir():
+                shutil.rmtree(job.path, ignore_errors=True)
+            else:
+                Path(job.path).unlink(missing_ok=True)
+
+        if chain:
+            next_id = IngestJob.objects.filter(
+                dataset_id=job.dataset_id, status=IngestJob.QUEUED
+            ).order_by('created_at', 'id').values_list('id', flat=True).first()
+            if next_id is not None:
+                submit(next_id)
+    finally:
+        connection.close()
+
+
+def _claim(job_id):
+    """Mark a queued job as running, unless its dataset already has a running job."""
+    with transaction.atomic():
+        job = IngestJob.objects.filter(id=job_id, status=IngestJob.QUEUED).first()
+        if job is None:
+            return None
+        # The dataset row lock orders concurrent claims for the same dataset
+        if Dataset.objects.select_for_update().filter(id=job.dataset_id).first() is None:
+            return None
+        if IngestJob.objects.filter(dataset_id=job.dataset_id, status=IngestJob.RUNNING).exists():
+            return None
+        claimed = IngestJob.objects.filter(id=job_id, status=IngestJob.QUEUED).update(
+            status=IngestJob.RUNNING, started_at=timezone.now(), finished_at=None, error=None
+        )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def _ingest(job):
+    """
+    Upsert the job's file one chunk per transaction, recording progress as
+    each commits. Returns the dataset's seating version after the job's last
+    write, or None if it wrote nothing.
+    """
+    from .views import _records_changed
+
+    if Path(job.path).is_dir():
+        _ingest_batch(job)
+        return None
+
+    dataset = job.dataset
+    filename = job.filename.lower()
+    # Rows committed by an earlier attempt are skipped, not re-imported
+    skip = job.rows_processed
+    if job.method == IngestJob.STAGING:
+        ingest = StagedIngest(dataset)
+    else:
+        # Streamed files look up matches per batch instead of preloading every key
+        ingest = RecordIngest(dataset, preload=filename.endswith('.xls'))
+    processes = getattr(settings, 'INGEST_EXCEL_PROCESSES', 0)
+    version = None
+    for df in read_upload(job.path, filename, processes=processes):
+        if skip:
+            skipped = min(skip, len(df))
+            df, skip = df.iloc[skipped:], skip - skipped
+            if df.empty:
+                continue
+
+        started = time.perf_counter()
+        created, updated, unchanged, failed = ingest.created, ingest.updated, ingest.unchanged, ingest.failed
+        with transaction.atomic():
+            parsed, rejected = parse_upload(df)
+            for row in parsed_rows(parsed):
+                ingest.add(row)
+            ingest.flush()
+            new_rooms = upsert_rooms(hall_seats(parsed))
+            IngestJob.objects.filter(id=job.id).update(
+                rows_processed=F('rows_processed') + len(df),
+                rows_failed=F('rows_failed') + ingest.failed - failed + rejected,
+                rows_rejected=F('rows_rejected') + rejected,
+                records_created=F('records_created') + ingest.created - created,
+                records_updated=F('records_updated') + ingest.updated - updated,
+                rows_unchanged=F('rows_unchanged') + ingest.unchanged - unchanged,
+                new_rooms=F('new_rooms') + new_rooms,
+                seconds=F('seconds') + (time.perf_counter() - started),
+            )
+
+        version = _records_changed(ingest.register_nos, [dataset.id]).get(dataset.id)
+        ingest.register_nos.clear()
+    return version
+
+
+def _ingest_batch(job):
+    """Ingest a batch upload's files as one merged write."""
+    files = sorted(Path(job.path).iterdir())
+    summary = ingest_files(job.dataset, [(str(path), path.name) for path in files], job.method)
+    IngestJob.objects.filter(id=job.id).update(
+        rows_processed=summary['rows_read'],
+        rows_failed=summary['failed'],
+        rows_rejected=summary['rejected'],
+        records_created=summary['created'],
+        records_updated=summary['updated'],
+        rows_unchanged=summary['unchanged'],
+        new_rooms=summary['new_rooms'],
+        seconds=summary['seconds'],
+    )
+
+
+def ingest_files(dataset, files, method=IngestJob.BATCHED, processes=None):
+    """
+    Parse (path, filename) pairs in parallel, merge them on
+    (register_no, course_code) in memory and write the result to the dataset
+    in one transaction. With the staging method that is a single set-based
+    merge. Returns the ingest summary plus rows_read, rejected and new_rooms;
+    failed includes the rejected rows.
+    """
+    from .views import _records_changed
+
+    if processes is None:
+        processes = getattr(settings, 'INGEST_BATCH_PROCESSES', 0)
+    started = time.perf_counter()
+    rows, halls, rows_read, rejected = read_uploads(files, processes)
+
+    if method == IngestJob.STAGING:
+        ingest = StagedIngest(dataset, batch_size=max(len(rows), 1))
+    else:
+        ingest = RecordIngest(dataset)
+    with transaction.atomic():
+        for row in rows:
+            ingest.add(row)
+        summary = ingest.finish()
+        summary['new_rooms'] = upsert_rooms(halls)
+
+    _records_changed(ingest.register_nos, [dataset.id])
+    summary['rows_read'] = rows_read
+    summary['rejected'] = rejected
+    summary['failed'] += rejected
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    return summary
@@ -0,0 +1,88 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.http import JsonResponse
+
+from exams import responses
+from exams.models import ExamRecord
+from exams.responses import FastJsonResponse, serialize_rows
+from exams.utils import encode_columnar
+from exams.views import RECORD_FIELDS, RECORD_DICTIONARY_FIELDS
+
+COURSES = [
+    ('UAM', 'B.Sc Applied Mathematics'),
+    ('UCS', 'B.Sc Computer Science'),
+    ('UPH', 'B.Sc Physics'),
+    ('UCH', 'B.Sc Chemistry'),
+    ('UEC', 'B.Sc Electronics'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark record list serialization: legacy JsonResponse vs FastJsonResponse'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Rows to serialize')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per variant (best is reported)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        rows = []
+        for i in range(options['rows']):
+            code, title = rng.choice(COURSES)
+            rows.append((
+                i + 1, f'24{code}{101 + i:05d}', f'Student {i}', code, title,
+                date(2025, 12, 10) + timedelta(days=rng.randrange(5)), rng.choice(['FN', 'AN']),
+                f'B{rng.randrange(200, 260)}', str(rng.randrange(1, 31)),
+                date(rng.randint(2001, 2003), rng.randint(1, 12), rng.randint(1, 28)),
+            ))
+        # The legacy view serialized model instances field by field
+        instances = [ExamRecord(**dict(zip(RECORD_FIELDS, row))) for row in rows]
+
+        def legacy():
+            data = [{
+                'record': r.record,
+                'register_no': r.register_no,
+                'student_name': r.student_name,
+                'course_code': r.course_code,
+                'course_title': r.course_title,
+                'exam_date': r.exam_date.strftime('%Y-%m-%d'),
+                'exam_session': r.exam_session,
+                'exam_hall_number': r.exam_hall_number,
+                'exam_seat_number': r.exam_seat_number,
+                'date_of_birth': r.date_of_birth.strftime('%Y-%m-%d') if r.date_of_birth else None,
+            } for r in instances]
+            return JsonResponse({'success': True, 'data': data})
+
+        def fast_rows():
+            return FastJsonResponse({'success': True, 'data': serialize_rows(RECORD_FIELDS, rows)})
+
+        def fast_columnar():
+            return FastJsonResponse({
+                'success': True,
+                'data': encode_columnar(RECORD_FIELDS, rows, RECORD_DICTIONARY_FIELDS),
+            })
+
+        encoder = 'orjson' if responses.orjson is not None else 'stdlib json'
+        self.stdout.write(f"Serializing {len(rows)} rows, best of {options['repeat']} (encoder: {encoder})")
+
+        baseline = None
+        for label, variant in [
+            ('JsonResponse, model instances', legacy),
+            ('FastJsonResponse, tuples', fast_rows),
+            ('FastJsonResponse, columnar', fast_columnar),
+        ]:
+            best = None
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                response = variant()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            baseline = baseline or best
+            self.stdout.write(
+                f'  {label:<32} {best * 1000:9.1f} ms  {len(response.content) / 1e6:7.2f} MB  '
+                f'x{baseline / best:.1f}'
+            )
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from exams.jobs import ingest_files
+from exams.models import Dataset, IngestJob
+
+
+class Command(BaseCommand):
+    help = ('Upload several CSV/Excel files into a dataset in one go: the files are parsed in parallel, '
+            'merged on (register_no, course_code) and written in a single transaction')
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset_id', type=int, help='Dataset to upload into')
+        parser.add_argument('paths', nargs='+', help='Files to upload; later files win conflicting rows')
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=None,
+            help='Processes that parse the files (default INGEST_BATCH_PROCESSES, 0 = in this process)'
+        )
+        parser.add_argument(
+            '--method',
+            choices=[IngestJob.BATCHED, IngestJob.STAGING],
+            default=None,
+            help='How the merged rows are written (default INGEST_METHOD)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            dataset = Dataset.objects.get(id=options['dataset_id'])
+        except Dataset.DoesNotExist:
+            raise CommandError(f'Dataset {options["dataset_id"]} does not exist')
+
+        files = []
+        for path in options['paths']:
+            if not Path(path).is_file():
+                raise CommandError(f'{path} is not a file')
+            filename = Path(path).name.lower()
+            if not filename.endswith(('.csv', '.xls', '.xlsx')):
+                raise CommandError(f'{path} is not a CSV or Excel file')
+            files.append((path, filename))
+
+        method = options['method'] or getattr(settings, 'INGEST_METHOD', IngestJob.BATCHED)
+        summary = ingest_files(dataset, files, method, options['processes'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(files)} files, {summary["rows_read"]} rows merged into {summary["rows"]}: '
+            f'created {summary["created"]}, updated {summary["updated"]}, unchanged {summary["unchanged"]}, '
+            f'failed {summary["failed"]} ({summary["rejected"]} rejected), {summary["new_rooms"]} new rooms in {summary["seconds"]}s'
+        ))
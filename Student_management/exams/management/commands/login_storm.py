@@ -0,0 +1,269 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from exams.cache import invalidate_student_logins
+from exams.models import Dataset, ExamRecord
+from exams.snapshot import published_dataset_id
+from exams.views import _records_changed
+
+# Same department shapes and names as generate_large_dataset.py
+DEPARTMENTS = [
+    {'code': 'UAM', 'name': 'B.Sc Applied Mathematics', 'weight': 30},
+    {'code': 'UCS', 'name': 'B.Sc Computer Science', 'weight': 40},
+    {'code': 'UPH', 'name': 'B.Sc Physics', 'weight': 30},
+    {'code': 'UCH', 'name': 'B.Sc Chemistry', 'weight': 25},
+    {'code': 'UEC', 'name': 'B.Sc Electronics', 'weight': 25},
+]
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Arjun', 'Sai', 'Ananya', 'Diya', 'Kavya', 'Meera', 'Rohan']
+LAST_NAMES = ['Sharma', 'Verma', 'Patel', 'Kumar', 'Singh', 'Reddy', 'Iyer', 'Nair', 'Rao', 'Pillai']
+HALL_CAPACITY = 30
+# Synthesized register numbers start with letters, unlike real ones (24UAM101), so they never collide
+REGISTER_PREFIX = 'LS'
+# Backdated so the scratch dataset never becomes Dataset.objects.first(), the admin views' fallback
+SCRATCH_CREATED_AT = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+LOGIN_PATH = '/api/student/login/'
+
+
+class Command(BaseCommand):
+    help = 'Fire a storm of concurrent student logins and report throughput and latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=None,
+                            help='Students to synthesize in a scratch dataset (default 1000, 0 with --replay)')
+        parser.add_argument('--requests', type=int, default=None,
+                            help='Logins to fire (default: one per student, or every replayed line)')
+        parser.add_argument('--concurrency', type=int, default=32, help='Worker threads')
+        parser.add_argument('--url', default=None,
+                            help='Base URL of a running server (e.g. http://127.0.0.1:8000); '
+                                 'defaults to the in-process test client. Synthesized students are written '
+                                 'to the database that server reads, and --cold and the cleanup only clear '
+                                 "this command's cache, so point it at a staging copy or use --replay")
+        parser.add_argument('--path', default=LOGIN_PATH, help='Login endpoint path')
+        parser.add_argument('--replay', default=None,
+                            help='JSONL file of {"register_no", "date_of_birth"} objects to replay')
+        parser.add_argument('--cold', action='store_true',
+                            help='Drop cached login payloads for the requested students first')
+        parser.add_argument('--no-throttle', action='store_true',
+                            help='Disable student login throttling for in-process runs')
+        parser.add_argument('--keep', action='store_true', help='Keep the scratch dataset afterwards')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        students = options['students']
+        if students is None:
+            students = 0 if options['replay'] else 1000
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be at least 1')
+        if students and published_dataset_id() is not None:
+            # The scratch dataset is active, so writing it would discard the live snapshot
+            raise CommandError(
+                'A seat snapshot is published; synthesizing students would discard it. '
+                'Run against a staging copy, unpublish first, or use --replay without --students'
+            )
+
+        dataset = None
+        credentials = []
+        try:
+            if students:
+                dataset, credentials = self._synthesize(students, rng)
+
+            if options['replay']:
+                logins = self._read_replay(options['replay'])
+                if options['requests']:
+                    logins = logins[:options['requests']]
+            else:
+                if not credentials:
+                    raise CommandError('Nothing to send: synthesize students or pass --replay')
+                count = options['requests'] or len(credentials)
+                logins = [rng.choice(credentials) for _ in range(count)]
+
+            if options['cold']:
+                invalidate_student_logins(r for r, _ in logins)
+
+            if options['no_throttle']:
+                with override_settings(STUDENT_LOGIN_THROTTLE={}):
+                    result = self._fire(logins, options)
+            else:
+                result = self._fire(logins, options)
+            self._report(result, options)
+        finally:
+            if dataset is not None and not options['keep']:
+                dataset.delete()
+                # Like delete_dataset: drops the scratch logins and the cached seating versions
+                _records_changed([r for r, _ in credentials], [dataset.id])
+
+    def _synthesize(self, count, rng):
+        """Create a scratch dataset of `count` students shaped like generate_large_dataset.py."""
+        dataset = Dataset.objects.create(
+            name=f"Login Storm - {timezone.now().strftime('%Y-%m-%d %H:%M:%S.%f')}",
+            exam_type='internal',
+            description='Scratch dataset created by the login_storm command',
+            is_active=True,
+        )
+        Dataset.objects.filter(id=dataset.id).update(created_at=SCRATCH_CREATED_AT)
+
+        total_weight = sum(d['weight'] for d in DEPARTMENTS)
+        records = []
+        credentials = []
+        for dept_index, dept in enumerate(DEPARTMENTS):
+            dept_count = count * dept['weight'] // total_weight
+            if dept_index == len(DEPARTMENTS) - 1:
+                dept_count = count - len(records)
+            for i in range(dept_count):
+                register_no = f"{REGISTER_PREFIX}{dept['code']}{101 + i:03d}"
+                dob = date(rng.randint(2001, 2003), rng.randint(1, 12), rng.randint(1, 28))
+                position = len(records)
+                records.append(ExamRecord(
+                    dataset=dataset,
+                    register_no=register_no,
+                    student_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                    course_code=dept['code'],
+                    course_title=dept['name'],
+                    exam_date=date(2025, 12, 15),
+                    exam_session='Morning',
+                    exam_hall_number=f'LS{position // HALL_CAPACITY + 1:03d}',
+                    exam_seat_number=str(position % HALL_CAPACITY + 1),
+                    date_of_birth=dob,
+                ))
+                credentials.append((register_no, dob.isoformat()))
+
+        ExamRecord.objects.bulk_create(records, batch_size=1000)
+        # Bumps the version the seat endpoint's ETags are built from, like any other write
+        _records_changed([r for r, _ in credentials], [dataset.id])
+        self.stdout.write(f'Synthesized {len(records)} students in dataset "{dataset.name}"')
+        return dataset, credentials
+
+    def _read_replay(self, path):
+        """Read login credentials from a JSONL request log, skipping other lines."""
+        logins = []
+        skipped = 0
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        skipped += 1
+                        continue
+                    if isinstance(entry, dict) and entry.get('register_no') and entry.get('date_of_birth'):
+                        logins.append((str(entry['register_no']), str(entry['date_of_birth'])))
+                    else:
+                        skipped += 1
+        except OSError as e:
+            raise CommandError(f'Cannot read replay file: {e}')
+
+        self.stdout.write(f'Replaying {len(logins)} logins from {path} ({skipped} lines skipped)')
+        if not logins:
+            raise CommandError('Replay file contains no register_no/date_of_birth entries')
+        return logins
+
+    def _fire(self, logins, options):
+        """Send the logins from a thread pool; return (wall_seconds, samples)."""
+        concurrency = min(options['concurrency'], len(logins))
+        chunks = [logins[i::concurrency] for i in range(concurrency)]
+        send = self._http_sender(options) if options['url'] else self._client_sender(options)
+
+        def run(chunk):
+            samples = []
+            try:
+                for register_no, dob in chunk:
+                    body = json.dumps({'register_no': register_no, 'date_of_birth': dob})
+                    samples.append(send(body))
+            finally:
+                connection.close()
+            return samples
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(run, chunks))
+        wall = time.perf_counter() - started
+        return wall, [sample for samples in results for sample in samples]
+
+    def _client_sender(self, options):
+        """Send through the in-process test client, counting queries per request."""
+        local = threading.local()
+        path = options['path']
+        rng = random.Random(options['seed'])
+
+        def send(body):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            queries = [0]
+
+            def count_queries(execute, sql, params, many, context):
+                queries[0] += 1
+                return execute(sql, params, many, context)
+
+            # Spread students over distinct client addresses like a real campus would
+            remote_addr = f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}'
+            started = time.perf_counter()
+            with connection.execute_wrapper(count_queries):
+                response = local.client.post(
+                    path, body, content_type='application/json', REMOTE_ADDR=remote_addr
+                )
+            return time.perf_counter() - started, response.status_code, queries[0]
+
+        return send
+
+    def _http_sender(self, options):
+        """Send to a running server over HTTP; query counts are not observable."""
+        url = options['url'].rstrip('/') + options['path']
+
+        def send(body):
+            request = urllib.request.Request(
+                url, data=body.encode('utf-8'), headers={'Content-Type': 'application/json'}, method='POST'
+            )
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except OSError:
+                status = 0
+            return time.perf_counter() - started, status, None
+
+        return send
+
+    def _report(self, result, options):
+        wall, samples = result
+        latencies = sorted(s[0] * 1000 for s in samples)
+        statuses = Counter(s[1] for s in samples)
+        query_counts = [s[2] for s in samples if s[2] is not None]
+
+        def percentile(p):
+            index = max(0, min(len(latencies) - 1, int(round(p / 100 * len(latencies))) - 1))
+            return latencies[index]
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('Login storm report'))
+        self.stdout.write(f"  Target:       {options['url'] or 'test client'}{options['path']}")
+        self.stdout.write(f"  Requests:     {len(samples)} over {wall:.2f}s with {min(options['concurrency'], len(samples))} threads")
+        self.stdout.write(f'  Throughput:   {len(samples) / wall:.1f} req/s')
+        self.stdout.write(
+            f'  Latency (ms): p50 {percentile(50):.2f}  p95 {percentile(95):.2f}  '
+            f'p99 {percentile(99):.2f}  max {latencies[-1]:.2f}'
+        )
+        if query_counts:
+            self.stdout.write(f'  Queries/req:  {sum(query_counts) / len(query_counts):.2f}')
+        else:
+            self.stdout.write('  Queries/req:  n/a (remote server)')
+        self.stdout.write('  Status codes: ' + ', '.join(f'{code}={n}' for code, n in sorted(statuses.items())))
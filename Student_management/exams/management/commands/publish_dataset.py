@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from exams.models import Dataset
+from exams.snapshot import publish_dataset, discard_snapshot, snapshot_path
+
+
+class Command(BaseCommand):
+    help = 'Publish a dataset\'s finished seating as the read-only student login snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset_id', nargs='?', type=int, help='Dataset to publish')
+        parser.add_argument(
+            '--unpublish',
+            action='store_true',
+            help='Remove the published snapshot so logins fall back to the database'
+        )
+
+    def handle(self, *args, **options):
+        if options['unpublish']:
+            if discard_snapshot():
+                self.stdout.write(self.style.SUCCESS('Removed published seat snapshot'))
+            else:
+                self.stdout.write(self.style.WARNING('No seat snapshot is published'))
+            return
+
+        if options['dataset_id'] is None:
+            raise CommandError('Provide a dataset id or --unpublish')
+
+        try:
+            dataset = Dataset.objects.get(id=options['dataset_id'])
+        except Dataset.DoesNotExist:
+            raise CommandError(f'Dataset {options["dataset_id"]} does not exist')
+
+        try:
+            student_count = publish_dataset(dataset)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Published seating for {student_count} students from "{dataset.name}" to {snapshot_path()}'
+        ))
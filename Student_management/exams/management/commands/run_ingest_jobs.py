@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from exams.jobs import run_job
+from exams.models import IngestJob
+
+
+class Command(BaseCommand):
+    help = 'Run queued upload ingest jobs in the foreground, e.g. ones left behind by a restarted server'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requeue',
+            action='store_true',
+            help='First put jobs left running by a stopped worker back in the queue '
+                 '(only while no server is processing uploads)'
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue']:
+            count = IngestJob.objects.filter(status=IngestJob.RUNNING).update(status=IngestJob.QUEUED)
+            self.stdout.write(f'Requeued {count} interrupted jobs')
+
+        job_ids = list(
+            IngestJob.objects.filter(status=IngestJob.QUEUED).order_by('created_at', 'id').values_list('id', flat=True)
+        )
+        if not job_ids:
+            self.stdout.write('No queued jobs')
+            return
+
+        for job_id in job_ids:
+            run_job(job_id, chain=False)
+            job = IngestJob.objects.get(id=job_id)
+            if job.skipped:
+                self.stdout.write(f'Job {job.id} ({job.filename}): identical to the last upload, skipped')
+            elif job.status == IngestJob.SUCCEEDED:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Job {job.id} ({job.filename}): {job.rows_processed} rows, created {job.records_created}, '
+                    f'updated {job.records_updated}, unchanged {job.rows_unchanged}, failed {job.rows_failed}, '
+                    f'{job.rows_rejected} rejected ({job.rows_per_second} rows/sec)'
+                ))
+            elif job.status == IngestJob.FAILED:
+                self.stdout.write(self.style.ERROR(f'Job {job.id} ({job.filename}) failed: {job.error}'))
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f'Job {job.id} ({job.filename}) is {job.status}; another job of its dataset is running'
+                ))
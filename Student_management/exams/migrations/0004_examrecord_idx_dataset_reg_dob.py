@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0003_dataset_examrecord_dataset'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='examrecord',
+            index=models.Index(fields=['dataset', 'register_no', 'date_of_birth'], name='idx_dataset_reg_dob'),
+        ),
+    ]
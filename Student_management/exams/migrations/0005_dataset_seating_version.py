@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0004_examrecord_idx_dataset_reg_dob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='seating_version',
+            field=models.PositiveIntegerField(default=0, help_text='Incremented whenever records or seating in this dataset change'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0005_dataset_seating_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='examrecord',
+            index=models.Index(fields=['dataset', '-exam_date', 'register_no', 'record'], name='idx_dataset_date_reg_record'),
+        ),
+    ]
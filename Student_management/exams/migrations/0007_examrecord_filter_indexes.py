@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0006_examrecord_idx_dataset_date_reg_record'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='examrecord',
+            index=models.Index(fields=['dataset', 'exam_hall_number', 'exam_seat_number', 'record'], name='idx_dataset_hall_seat'),
+        ),
+        migrations.AddIndex(
+            model_name='examrecord',
+            index=models.Index(fields=['dataset', 'course_code', 'register_no', 'record'], name='idx_dataset_course_reg'),
+        ),
+        migrations.AddIndex(
+            model_name='examrecord',
+            index=models.Index(fields=['dataset', 'exam_date', 'exam_session', 'exam_hall_number'], name='idx_dataset_date_session_hall'),
+        ),
+    ]
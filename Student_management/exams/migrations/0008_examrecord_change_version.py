@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0007_examrecord_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record', models.IntegerField(help_text='Primary key of the deleted record')),
+                ('register_no', models.CharField(help_text='Register number of the deleted record', max_length=50)),
+                ('change_version', models.PositiveIntegerField(help_text='Dataset seating version of the delete')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, help_text='When the record was deleted')),
+            ],
+            options={
+                'verbose_name': 'Record Tombstone',
+                'verbose_name_plural': 'Record Tombstones',
+                'db_table': 'RecordTombstone',
+            },
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='records_reset_version',
+            field=models.PositiveIntegerField(default=0, help_text='Seating version at which all records of this dataset were last cleared'),
+        ),
+        migrations.AddField(
+            model_name='examrecord',
+            name='change_version',
+            field=models.PositiveIntegerField(db_column='ChangeVersion', default=0, help_text='Dataset seating version at which this record last changed'),
+        ),
+        migrations.AddIndex(
+            model_name='examrecord',
+            index=models.Index(fields=['dataset', 'change_version', 'record'], name='idx_dataset_change_version'),
+        ),
+        migrations.AddField(
+            model_name='recordtombstone',
+            name='dataset',
+            field=models.ForeignKey(help_text='Dataset the deleted record belonged to', on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to='exams.dataset'),
+        ),
+        migrations.AddIndex(
+            model_name='recordtombstone',
+            index=models.Index(fields=['dataset', 'change_version'], name='idx_tombstone_dataset_version'),
+        ),
+    ]
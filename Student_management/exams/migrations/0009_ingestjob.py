@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0008_examrecord_change_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(help_text='Name of the uploaded file', max_length=255)),
+                ('path', models.CharField(help_text='Where the uploaded file is kept until the job succeeds', max_length=500)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', help_text='Where the job is in its lifecycle', max_length=20)),
+                ('rows_processed', models.PositiveIntegerField(default=0, help_text='File rows ingested and committed so far')),
+                ('rows_failed', models.PositiveIntegerField(default=0, help_text='Rows that could not be written')),
+                ('records_created', models.PositiveIntegerField(default=0, help_text='Records created by the job')),
+                ('records_updated', models.PositiveIntegerField(default=0, help_text='Records updated by the job')),
+                ('new_rooms', models.PositiveIntegerField(default=0, help_text='Rooms created from the uploaded halls')),
+                ('seconds', models.FloatField(default=0, help_text='Time spent ingesting so far')),
+                ('error', models.TextField(blank=True, help_text='Why the job failed', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='When the file was uploaded')),
+                ('started_at', models.DateTimeField(blank=True, help_text='When a worker last picked the job up', null=True)),
+                ('finished_at', models.DateTimeField(blank=True, help_text='When the job succeeded or failed', null=True)),
+                ('dataset', models.ForeignKey(help_text='Dataset the rows are uploaded into', on_delete=django.db.models.deletion.CASCADE, related_name='ingest_jobs', to='exams.dataset')),
+            ],
+            options={
+                'verbose_name': 'Ingest Job',
+                'verbose_name_plural': 'Ingest Jobs',
+                'db_table': 'IngestJob',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['dataset', 'status', 'created_at'], name='idx_ingest_dataset_status')],
+            },
+        ),
+    ]
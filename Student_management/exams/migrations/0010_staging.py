@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0009_ingestjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestjob',
+            name='method',
+            field=models.CharField(choices=[('batched', 'Batched ORM upsert'), ('staging', 'Staging table with set-based merge')], default='batched', help_text='How the rows are written into ExamRecord', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='StagedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('load', models.CharField(help_text='Ingest run the row was staged by', max_length=32)),
+                ('register_no', models.CharField(max_length=50)),
+                ('course_code', models.CharField(max_length=20)),
+                ('student_name', models.CharField(blank=True, max_length=200, null=True)),
+                ('course_title', models.CharField(blank=True, max_length=200, null=True)),
+                ('exam_date', models.DateField(blank=True, null=True)),
+                ('exam_session', models.CharField(blank=True, max_length=50, null=True)),
+                ('date_of_birth', models.DateField(blank=True, null=True)),
+                ('exam_hall_number', models.CharField(blank=True, max_length=20, null=True)),
+                ('exam_seat_number', models.CharField(blank=True, max_length=20, null=True)),
+            ],
+            options={
+                'verbose_name': 'Staged Record',
+                'verbose_name_plural': 'Staged Records',
+                'db_table': 'ExamRecordStaging',
+                'indexes': [models.Index(fields=['load', 'register_no', 'course_code'], name='idx_staging_load_key')],
+            },
+        ),
+    ]
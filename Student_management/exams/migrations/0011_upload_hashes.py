@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0010_staging'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='upload_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the last file uploaded into this dataset', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='upload_hash_version',
+            field=models.PositiveIntegerField(blank=True, help_text='Seating version right after that upload; an identical upload is skipped while it is current', null=True),
+        ),
+        migrations.AddField(
+            model_name='examrecord',
+            name='row_hash',
+            field=models.CharField(blank=True, db_column='RowHash', editable=False, help_text='content_hash of CONTENT_FIELDS as stored; empty when unknown (e.g. after a bulk update)', max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingestjob',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the uploaded file', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingestjob',
+            name='rows_unchanged',
+            field=models.PositiveIntegerField(default=0, help_text='Rows that matched a record without changing it'),
+        ),
+        migrations.AddField(
+            model_name='ingestjob',
+            name='skipped',
+            field=models.BooleanField(default=False, help_text='The file was identical to the last upload of the unchanged dataset, so nothing ran'),
+        ),
+        migrations.AddField(
+            model_name='stagedrecord',
+            name='row_hash',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+    ]
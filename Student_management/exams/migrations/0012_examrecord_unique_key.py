@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:37
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def collapse_duplicates(apps, schema_editor):
+    """
+    Keep only the lowest-numbered record of each (dataset, register_no,
+    course_code), the one uploads have always matched, with set-based
+    statements. Each affected dataset moves to a new seating version, and the
+    deleted records leave tombstones at it for delta sync clients.
+    """
+    ExamRecord = apps.get_model('exams', 'ExamRecord')
+    Dataset = apps.get_model('exams', 'Dataset')
+    RecordTombstone = apps.get_model('exams', 'RecordTombstone')
+    connection = schema_editor.connection
+    q = connection.ops.quote_name
+
+    meta = ExamRecord._meta
+    table = q(meta.db_table)
+    pk, dataset, register_no, course_code = (
+        q(meta.get_field(name).column) for name in ('record', 'dataset', 'register_no', 'course_code')
+    )
+    # Wrapped in a derived table so MySQL accepts it in a DELETE from the same table
+    duplicate = (
+        f"{dataset} IS NOT NULL AND {pk} NOT IN (SELECT keep FROM ("
+        f"SELECT MIN({pk}) AS keep FROM {table} WHERE {dataset} IS NOT NULL "
+        f"GROUP BY {dataset}, {register_no}, {course_code}) AS k)"
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {dataset}, {pk}, {register_no} FROM {table} WHERE {duplicate}")
+        duplicates = cursor.fetchall()
+        if not duplicates:
+            return
+
+        dataset_ids = {dataset_id for dataset_id, _, _ in duplicates}
+        Dataset.objects.filter(id__in=dataset_ids).update(seating_version=F('seating_version') + 1)
+        versions = dict(Dataset.objects.filter(id__in=dataset_ids).values_list('id', 'seating_version'))
+        RecordTombstone.objects.bulk_create([
+            RecordTombstone(
+                dataset_id=dataset_id, record=record, register_no=register_no, change_version=versions[dataset_id]
+            )
+            for dataset_id, record, register_no in duplicates
+        ], batch_size=1000)
+        cursor.execute(f"DELETE FROM {table} WHERE {duplicate}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0011_upload_hashes'),
+    ]
+
+    operations = [
+        migrations.RunPython(collapse_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='examrecord',
+            constraint=models.UniqueConstraint(fields=('dataset', 'register_no', 'course_code'), name='uniq_dataset_register_course'),
+        ),
+    ]
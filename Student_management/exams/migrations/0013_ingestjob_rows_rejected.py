@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0012_examrecord_unique_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestjob',
+            name='rows_rejected',
+            field=models.PositiveIntegerField(default=0, help_text='Failed rows dropped while parsing: a required field missing or an invalid register number'),
+        ),
+    ]
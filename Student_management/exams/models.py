@@ -1,7 +1,15 @@
+import hashlib
+
 from django.db import models
 from django.core.validators import RegexValidator
 
 
+def content_hash(values):
+    """MD5 of a record's content values (in ExamRecord.CONTENT_FIELDS order), as kept in row_hash."""
+    text = '\x1f'.join('' if value is None else str(value) for value in values)
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
 class Dataset(models.Model):
     """Model to manage different datasets for exam records (e.g., End Semester, Arrear, Internal)."""
     
@@ -32,6 +40,25 @@ class Dataset(models.Model):
         null=True,
         help_text='Optional description of this dataset'
     )
+    seating_version = models.PositiveIntegerField(
+        default=0,
+        help_text='Incremented whenever records or seating in this dataset change'
+    )
+    records_reset_version = models.PositiveIntegerField(
+        default=0,
+        help_text='Seating version at which all records of this dataset were last cleared'
+    )
+    upload_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        help_text='SHA-256 of the last file uploaded into this dataset'
+    )
+    upload_hash_version = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text='Seating version right after that upload; an identical upload is skipped while it is current'
+    )
     
     class Meta:
         db_table = 'Dataset'
@@ -51,6 +78,12 @@ class Dataset(models.Model):
 class ExamRecord(models.Model):
     """Model for storing exam records with all required fields."""
     
+    # Fields an upload writes, and that row_hash covers
+    CONTENT_FIELDS = (
+        'student_name', 'course_title', 'exam_date', 'exam_session', 'date_of_birth',
+        'exam_hall_number', 'exam_seat_number',
+    )
+    
     dataset = models.ForeignKey(
         Dataset,
         on_delete=models.CASCADE,
@@ -107,6 +140,19 @@ class ExamRecord(models.Model):
         blank=True,
         help_text='Date of birth for authentication'
     )
+    change_version = models.PositiveIntegerField(
+        default=0,
+        db_column='ChangeVersion',
+        help_text='Dataset seating version at which this record last changed'
+    )
+    row_hash = models.CharField(
+        max_length=32,
+        db_column='RowHash',
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='content_hash of CONTENT_FIELDS as stored; empty when unknown (e.g. after a bulk update)'
+    )
 
     class Meta:
         db_table = 'ExamRecord'
@@ -115,11 +161,159 @@ class ExamRecord(models.Model):
         indexes = [
             models.Index(fields=['register_no'], name='idx_register_no'),
             models.Index(fields=['exam_date'], name='idx_exam_date'),
+            models.Index(fields=['dataset', 'register_no', 'date_of_birth'], name='idx_dataset_reg_dob'),
+            models.Index(fields=['dataset', '-exam_date', 'register_no', 'record'], name='idx_dataset_date_reg_record'),
+            models.Index(fields=['dataset', 'exam_hall_number', 'exam_seat_number', 'record'], name='idx_dataset_hall_seat'),
+            models.Index(fields=['dataset', 'course_code', 'register_no', 'record'], name='idx_dataset_course_reg'),
+            models.Index(fields=['dataset', 'exam_date', 'exam_session', 'exam_hall_number'], name='idx_dataset_date_session_hall'),
+            models.Index(fields=['dataset', 'change_version', 'record'], name='idx_dataset_change_version'),
+        ]
+        constraints = [
+            # One record per student and course in a dataset; uploads upsert against it
+            models.UniqueConstraint(fields=['dataset', 'register_no', 'course_code'], name='uniq_dataset_register_course'),
         ]
 
     def __str__(self):
         return f"{self.register_no} - {self.student_name} - {self.course_code}"
 
+    def save(self, *args, **kwargs):
+        # Keep row_hash in step with the content, so uploads can skip rows that change nothing
+        self.row_hash = content_hash(getattr(self, field) for field in self.CONTENT_FIELDS)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'row_hash'}
+        super().save(*args, **kwargs)
+
+
+class RecordTombstone(models.Model):
+    """Marker left behind by a deleted exam record, for delta sync clients."""
+
+    dataset = models.ForeignKey(
+        Dataset,
+        on_delete=models.CASCADE,
+        related_name='tombstones',
+        help_text='Dataset the deleted record belonged to'
+    )
+    record = models.IntegerField(help_text='Primary key of the deleted record')
+    register_no = models.CharField(max_length=50, help_text='Register number of the deleted record')
+    change_version = models.PositiveIntegerField(help_text='Dataset seating version of the delete')
+    deleted_at = models.DateTimeField(auto_now_add=True, help_text='When the record was deleted')
+
+    class Meta:
+        db_table = 'RecordTombstone'
+        verbose_name = 'Record Tombstone'
+        verbose_name_plural = 'Record Tombstones'
+        indexes = [
+            models.Index(fields=['dataset', 'change_version'], name='idx_tombstone_dataset_version'),
+        ]
+
+    def __str__(self):
+        return f"{self.register_no} - {self.record} (deleted at v{self.change_version})"
+
+
+class StagedRecord(models.Model):
+    """Parsed upload row waiting to be merged into ExamRecord by a set-based statement."""
+
+    load = models.CharField(max_length=32, help_text='Ingest run the row was staged by')
+    register_no = models.CharField(max_length=50)
+    course_code = models.CharField(max_length=20)
+    # Blank means "keep the stored value", as for a blank upload cell
+    student_name = models.CharField(max_length=200, blank=True, null=True)
+    course_title = models.CharField(max_length=200, blank=True, null=True)
+    exam_date = models.DateField(blank=True, null=True)
+    exam_session = models.CharField(max_length=50, blank=True, null=True)
+    date_of_birth = models.DateField(blank=True, null=True)
+    exam_hall_number = models.CharField(max_length=20, blank=True, null=True)
+    exam_seat_number = models.CharField(max_length=20, blank=True, null=True)
+    # Set only when the row fully determines the record's content
+    row_hash = models.CharField(max_length=32, blank=True, null=True)
+
+    class Meta:
+        db_table = 'ExamRecordStaging'
+        verbose_name = 'Staged Record'
+        verbose_name_plural = 'Staged Records'
+        indexes = [
+            models.Index(fields=['load', 'register_no', 'course_code'], name='idx_staging_load_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.register_no} - {self.course_code} (load {self.load})"
+
+
+class IngestJob(models.Model):
+    """An uploaded file waiting for or going through background ingest."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    BATCHED = 'batched'
+    STAGING = 'staging'
+
+    dataset = models.ForeignKey(
+        Dataset,
+        on_delete=models.CASCADE,
+        related_name='ingest_jobs',
+        help_text='Dataset the rows are uploaded into'
+    )
+    filename = models.CharField(max_length=255, help_text='Name of the uploaded file')
+    path = models.CharField(max_length=500, help_text='Where the uploaded file is kept until the job succeeds')
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            (QUEUED, 'Queued'),
+            (RUNNING, 'Running'),
+            (SUCCEEDED, 'Succeeded'),
+            (FAILED, 'Failed'),
+        ],
+        default=QUEUED,
+        help_text='Where the job is in its lifecycle'
+    )
+    method = models.CharField(
+        max_length=20,
+        choices=[
+            (BATCHED, 'Batched ORM upsert'),
+            (STAGING, 'Staging table with set-based merge'),
+        ],
+        default=BATCHED,
+        help_text='How the rows are written into ExamRecord'
+    )
+    rows_processed = models.PositiveIntegerField(default=0, help_text='File rows ingested and committed so far')
+    rows_failed = models.PositiveIntegerField(default=0, help_text='Rows that could not be written')
+    rows_rejected = models.PositiveIntegerField(
+        default=0, help_text='Failed rows dropped while parsing: a required field missing or an invalid register number'
+    )
+    rows_unchanged = models.PositiveIntegerField(default=0, help_text='Rows that matched a record without changing it')
+    records_created = models.PositiveIntegerField(default=0, help_text='Records created by the job')
+    records_updated = models.PositiveIntegerField(default=0, help_text='Records updated by the job')
+    new_rooms = models.PositiveIntegerField(default=0, help_text='Rooms created from the uploaded halls')
+    seconds = models.FloatField(default=0, help_text='Time spent ingesting so far')
+    content_hash = models.CharField(max_length=64, blank=True, null=True, help_text='SHA-256 of the uploaded file')
+    skipped = models.BooleanField(
+        default=False, help_text='The file was identical to the last upload of the unchanged dataset, so nothing ran'
+    )
+    error = models.TextField(blank=True, null=True, help_text='Why the job failed')
+    created_at = models.DateTimeField(auto_now_add=True, help_text='When the file was uploaded')
+    started_at = models.DateTimeField(blank=True, null=True, help_text='When a worker last picked the job up')
+    finished_at = models.DateTimeField(blank=True, null=True, help_text='When the job succeeded or failed')
+
+    class Meta:
+        db_table = 'IngestJob'
+        verbose_name = 'Ingest Job'
+        verbose_name_plural = 'Ingest Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['dataset', 'status', 'created_at'], name='idx_ingest_dataset_status'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} -> {self.dataset_id} ({self.status})"
+
+    @property
+    def rows_per_second(self):
+        """Ingest throughput so far."""
+        return round(self.rows_processed / self.seconds, 1) if self.seconds else None
+
 
 class Room(models.Model):
     """Model to manage exam rooms and their availability."""
@@ -0,0 +1,37 @@
+"""
+Shared JSON response class and row serializer for the exams API.
+
+Uses orjson when it is installed and falls back to the standard library
+encoder otherwise. Both encode ``date``/``datetime`` values natively (as ISO
+8601), so views can hand over ``values_list`` tuples without formatting each
+date field per row.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def dumps(data):
+    """Encode data to JSON bytes with the fastest available encoder."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8')
+
+
+def serialize_rows(fields, rows):
+    """Turn values_list tuples into dicts keyed by fields (values are left for the encoder)."""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+class FastJsonResponse(HttpResponse):
+    """Drop-in replacement for JsonResponse that uses dumps()."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
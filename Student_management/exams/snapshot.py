@@ -0,0 +1,227 @@
+"""
+Read-only seat snapshots for the student login hot path.
+
+Publishing a dataset freezes its finished seating into one compact file that
+every worker memory-maps, so concurrent processes share a single copy through
+the page cache and a login is answered by a binary search without touching
+the database. The file holds every active dataset's exams, as the database
+lookup returns them, so a student with an arrear exam in another active
+dataset keeps it; any write to an active dataset discards the file.
+
+The file also records the active datasets' seating versions it was built
+from. A process maps a replaced file only after checking them against the
+database, so a file written by a publish that raced a write, after the
+write had already discarded the old one, is never served.
+
+File layout (little endian):
+
+    header   magic(8s) dataset_id(Q) count(I) key_width(H) version_count(H)
+    versions version_count x [dataset_id(Q), seating_version(I)]
+    index    count x [register_no NUL-padded to key_width, offset(I), length(I)]
+    records  UTF-8 JSON objects mapping date of birth -> timetable payload
+
+Index entries are sorted by the encoded register number; offsets are relative
+to the start of the record area.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from .models import Dataset
+from .utils import active_exam_records, student_login_payload
+
+MAGIC = b'EXSNAP02'
+HEADER = struct.Struct('<8sQIHH')
+VERSION = struct.Struct('<QI')
+OFFSETS = struct.Struct('<II')
+
+_lock = threading.Lock()
+_current = None
+
+
+def snapshot_path():
+    """Location of the published snapshot file."""
+    default = Path(settings.BASE_DIR) / 'snapshots' / 'seating.snap'
+    return Path(getattr(settings, 'SEAT_SNAPSHOT_PATH', default))
+
+
+def _active_versions():
+    """(dataset id, seating_version) pairs of the active datasets, read from the database."""
+    return [tuple(pair) for pair in Dataset.objects.filter(is_active=True).order_by('id').values_list('id', 'seating_version')]
+
+
+def publish_dataset(dataset):
+    """
+    Freeze the finished seating of a dataset, together with the other active
+    datasets' exams, into the snapshot file.
+
+    Replaces any previously published snapshot atomically and returns the
+    number of students written. Raises ValueError for an inactive dataset,
+    while students of any active dataset are still pending allocation, or
+    when an active dataset changed while the file was being built.
+    """
+    if not dataset.is_active:
+        raise ValueError(f'Dataset "{dataset.name}" is not active, so student login does not read it')
+    # Every active dataset ends up in the file, not just the one published
+    pending = Dataset.objects.filter(is_active=True, records__exam_hall_number='Pending').distinct()
+    pending = list(pending.order_by('id').values_list('name', flat=True))
+    if pending:
+        names = ', '.join(f'"{name}"' for name in pending)
+        raise ValueError(f'Active dataset {names} still has students pending allocation')
+
+    # Read before the records, so a write landing in between shows up as a version change
+    versions = _active_versions()
+
+    # Group each student's exams per date of birth, as the login lookup does
+    timetables = {}
+    for record in active_exam_records().iterator(chunk_size=2000):
+        if record.date_of_birth is None:
+            continue
+        key = (record.register_no.encode('utf-8'), record.date_of_birth.isoformat())
+        timetables.setdefault(key, []).append(record)
+
+    students = {}
+    for (register_no, dob), exam_records in timetables.items():
+        students.setdefault(register_no, {})[dob] = student_login_payload(exam_records)
+
+    keys = sorted(students)
+    key_width = max((len(k) for k in keys), default=1)
+    entry = struct.Struct(f'<{key_width}sII')
+
+    index = bytearray()
+    blobs = []
+    offset = 0
+    for key in keys:
+        blob = json.dumps(students[key], separators=(',', ':')).encode('utf-8')
+        index += entry.pack(key, offset, len(blob))
+        blobs.append(blob)
+        offset += len(blob)
+
+    path = snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, dataset.id, len(keys), key_width, len(versions)))
+        for dataset_id, version in versions:
+            f.write(VERSION.pack(dataset_id, version))
+        f.write(index)
+        for blob in blobs:
+            f.write(blob)
+    if _active_versions() != versions:
+        os.remove(tmp_path)
+        raise ValueError('Seating changed while the snapshot was being built; publish again')
+    # Workers still holding the old mapping keep reading the old inode
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+class _Snapshot:
+    """A memory-mapped snapshot file."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            self.signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.dataset_id, self.count, self.key_width, version_count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a seat snapshot')
+        self.versions = [VERSION.unpack_from(self.mm, HEADER.size + i * VERSION.size) for i in range(version_count)]
+        self.index_start = HEADER.size + version_count * VERSION.size
+        self.entry_size = self.key_width + OFFSETS.size
+        self.records_start = self.index_start + self.count * self.entry_size
+        # Built from older rows than the database now holds: kept mapped (so it can be
+        # discarded) but never served
+        self.stale = self.versions != _active_versions()
+
+    def lookup(self, register_no):
+        """Binary search the index; return the payload map or None."""
+        key = register_no.encode('utf-8')
+        if len(key) > self.key_width:
+            return None
+        key = key.ljust(self.key_width, b'\0')
+
+        mm = self.mm
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = self.index_start + mid * self.entry_size
+            probe = mm[pos:pos + self.key_width]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                offset, length = OFFSETS.unpack_from(mm, pos + self.key_width)
+                start = self.records_start + offset
+                return json.loads(mm[start:start + length])
+        return None
+
+
+def _load():
+    """
+    Return the current snapshot, re-mapping it (and checking its versions)
+    when the file was replaced.
+    """
+    global _current
+    path = snapshot_path()
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        _current = None
+        return None
+
+    snapshot = _current
+    if snapshot is not None and snapshot.signature == (st.st_ino, st.st_mtime_ns, st.st_size):
+        return snapshot
+
+    with _lock:
+        if _current is None or _current.signature != (st.st_ino, st.st_mtime_ns, st.st_size):
+            try:
+                _current = _Snapshot(path)
+            except (FileNotFoundError, ValueError):
+                _current = None
+        return _current
+
+
+def lookup_student_login(register_no, date_of_birth):
+    """Return the published payload for (register_no, date_of_birth) or None."""
+    snapshot = _load()
+    if snapshot is None or snapshot.stale:
+        return None
+    payloads = snapshot.lookup(register_no)
+    if not payloads:
+        return None
+    return payloads.get(date_of_birth.isoformat())
+
+
+def published_dataset_id():
+    """Id of the dataset currently published, or None."""
+    snapshot = _load()
+    return snapshot.dataset_id if snapshot is not None and not snapshot.stale else None
+
+
+def discard_snapshot(dataset_ids=None):
+    """
+    Remove the published snapshot after a write to dataset_ids, unless they
+    are all existing inactive datasets other than the published one, whose
+    rows it does not hold (unconditionally when dataset_ids is None).
+    """
+    snapshot = _load()
+    if snapshot is None:
+        return False
+    if dataset_ids is not None:
+        dataset_ids = set(dataset_ids)
+        inactive = Dataset.objects.filter(id__in=dataset_ids, is_active=False).count()
+        if snapshot.dataset_id not in dataset_ids and inactive == len(dataset_ids):
+            return False
+    try:
+        os.remove(snapshot_path())
+    except FileNotFoundError:
+        pass
+    return True
@@ -0,0 +1,63 @@
+"""
+Shared fixtures for the exams tests.
+
+Every test runs with the login throttle off (throttle tests turn it back on),
+an empty cache and its own snapshot and upload directories.
+"""
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from exams.models import Dataset, ExamRecord
+
+ADMIN_USERNAME = 'Kgkite'
+ADMIN_PASSWORD = 'Kite@2025'
+
+
+def make_record(dataset, register_no, course_code, hall='Pending', seat='Pending', **fields):
+    """Create an exam record with placeholder values for the fields a test does not care about."""
+    values = {
+        'student_name': f'Student {register_no}',
+        'course_title': f'Course {course_code}',
+        'exam_date': date(2025, 12, 15),
+        'exam_session': 'FN',
+        'date_of_birth': date(2003, 1, 2),
+    }
+    values.update(fields)
+    return ExamRecord.objects.create(
+        dataset=dataset, register_no=register_no, course_code=course_code,
+        exam_hall_number=hall, exam_seat_number=seat, **values
+    )
+
+
+class ExamsTestMixin:
+    """Isolated settings and an admin client; mix into TestCase or TransactionTestCase."""
+
+    def setUp(self):
+        super().setUp()
+        self.scratch = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.scratch, ignore_errors=True)
+        overrides = override_settings(
+            SEAT_SNAPSHOT_PATH=self.scratch / 'snapshots' / 'seating.snap',
+            INGEST_UPLOAD_DIR=self.scratch / 'uploads',
+            INGEST_BATCH_PROCESSES=0,
+            STUDENT_LOGIN_THROTTLE={},
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        User.objects.create_superuser(ADMIN_USERNAME, 'admin@example.com', ADMIN_PASSWORD)
+        self.admin = self.client_class()
+        self.admin.login(username=ADMIN_USERNAME, password=ADMIN_PASSWORD)
+        self.dataset = Dataset.objects.create(name='End Semester', exam_type='end_semester')
+
+
+class ExamsTestCase(ExamsTestMixin, TestCase):
+    pass
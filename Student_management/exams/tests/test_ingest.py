@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TransactionTestCase
+
+from exams.jobs import create_job, ingest_files, run_job
+from exams.models import Dataset, ExamRecord, IngestJob
+from exams.views import _records_changed
+
+from .base import ExamsTestCase, ExamsTestMixin, make_record
+
+HEADER = 'register no,student name,course code,course title,exam date,exam session,date of birth\n'
+# Two good rows, one without a name and one with a register number the model rejects
+UPLOAD = (
+    HEADER
+    + '24UAM101,Asha,UAM301,Algebra,2025-12-15,FN,2003-01-02\n'
+    + '24uam102,Bala,UAM301,Algebra,15-12-2025,FN,03/02/2003\n'
+    + '24UAM103,,UAM301,Algebra,2025-12-15,FN,2003-02-03\n'
+    + '24-UAM104,Devi,UAM301,Algebra,2025-12-15,FN,2003-04-05\n'
+)
+
+
+class IngestFilesTests(ExamsTestCase):
+    """Counters of a batch ingest, including the rows parse_upload drops."""
+
+    def write(self, name, content):
+        path = self.scratch / name
+        path.write_text(content)
+        return str(path), name
+
+    def test_rejected_rows_count_as_failed(self):
+        for method in (IngestJob.BATCHED, IngestJob.STAGING):
+            with self.subTest(method=method):
+                ExamRecord.objects.filter(dataset=self.dataset).delete()
+                summary = ingest_files(self.dataset, [self.write('marks.csv', UPLOAD)], method)
+                self.assertEqual(summary['rows_read'], 4)
+                self.assertEqual(summary['rejected'], 2)
+                self.assertEqual(summary['failed'], 2)
+                self.assertEqual(summary['created'], 2)
+                self.assertEqual(
+                    sorted(ExamRecord.objects.filter(dataset=self.dataset).values_list('register_no', flat=True)),
+                    ['24UAM101', '24UAM102'],
+                )
+
+    def test_later_files_win_and_unchanged_rows_are_counted(self):
+        make_record(self.dataset, '24UAM101', 'UAM301', student_name='Asha', course_title='Algebra')
+        second = HEADER + '24UAM102,Bala K,UAM301,Algebra,2025-12-15,FN,2003-02-03\n'
+        summary = ingest_files(self.dataset, [self.write('a.csv', UPLOAD), self.write('b.csv', second)])
+        self.assertEqual(summary['rows_read'], 5)
+        self.assertEqual(summary['failed'], 2)
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(summary['unchanged'], 1)
+        self.assertEqual(
+            ExamRecord.objects.get(dataset=self.dataset, register_no='24UAM102').student_name, 'Bala K'
+        )
+
+
+@mock.patch('exams.jobs.submit')
+class IngestJobTests(ExamsTestMixin, TransactionTestCase):
+    """A queued upload job run to completion."""
+
+    def upload(self, content=UPLOAD):
+        return create_job(self.dataset, SimpleUploadedFile('marks.csv', content.encode('utf-8')))
+
+    def test_job_counters(self, submit):
+        job = self.upload()
+        submit.assert_called_once_with(job.id)
+        run_job(job.id, chain=False)
+
+        data = self.admin.get(f'/api/admin/upload/jobs/{job.id}/').json()['data']
+        self.assertEqual(data['status'], IngestJob.SUCCEEDED)
+        self.assertEqual(
+            (data['rows_processed'], data['rows_failed'], data['rows_rejected'], data['created']), (4, 2, 2, 2)
+        )
+
+    def test_identical_upload_is_skipped_until_the_dataset_changes(self, submit):
+        run_job(self.upload().id, chain=False)
+        self.assertTrue(self.upload().skipped)
+
+        _records_changed(['24UAM101'], [self.dataset.id])
+        job = self.upload()
+        self.assertFalse(job.skipped)
+        run_job(job.id, chain=False)
+        self.assertEqual(IngestJob.objects.get(id=job.id).rows_unchanged, 2)
+        dataset = Dataset.objects.get(id=self.dataset.id)
+        self.assertEqual(dataset.upload_hash_version, dataset.seating_version)
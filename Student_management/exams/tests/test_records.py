@@ -0,0 +1,148 @@
+from datetime import date
+
+from exams.models import ExamRecord
+from exams.views import _records_changed
+
+from .base import ExamsTestCase, make_record
+
+RECORDS_URL = '/api/admin/records/'
+CHANGES_URL = '/api/admin/records/changes/'
+
+
+class RecordPaginationTests(ExamsTestCase):
+    """get_all_records keyset pagination."""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(7):
+            make_record(
+                self.dataset, f'24UAM{100 + i}', 'UAM301', hall=f'A{i % 3}', seat=str(i),
+                exam_date=date(2025, 12, 15 + i % 2),
+            )
+
+    def pages(self, **params):
+        """Every page of a listing, following next_cursor."""
+        pages = []
+        cursor = None
+        while True:
+            query = dict(params, page_size=3)
+            if cursor:
+                query['cursor'] = cursor
+            response = self.admin.get(RECORDS_URL, query)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            pages.append(body['data'])
+            cursor = body['next_cursor']
+            if cursor is None:
+                return pages
+
+    def test_cursor_walks_every_row_once_in_sort_order(self):
+        for sort, key in (
+            ('hall', lambda row: (row['exam_hall_number'], row['exam_seat_number'], row['record'])),
+            ('register_no', lambda row: (row['register_no'], row['record'])),
+        ):
+            with self.subTest(sort=sort):
+                pages = self.pages(sort=sort)
+                rows = [row for page in pages for row in page]
+                self.assertEqual([len(page) for page in pages], [3, 3, 1])
+                self.assertEqual(rows, sorted(rows, key=key))
+                self.assertEqual(len({row['record'] for row in rows}), 7)
+
+    def test_descending_date_sort_pages_across_equal_keys(self):
+        rows = [row for page in self.pages(sort='date') for row in page]
+        self.assertEqual([row['exam_date'] for row in rows], ['2025-12-16'] * 3 + ['2025-12-15'] * 4)
+        self.assertEqual(len({row['record'] for row in rows}), 7)
+
+    def test_filters_apply_to_every_page(self):
+        rows = [row for page in self.pages(sort='hall', hall='A0') for row in page]
+        self.assertEqual({row['exam_hall_number'] for row in rows}, {'A0'})
+        self.assertEqual(len(rows), 3)
+
+    def test_rows_inserted_behind_the_cursor_are_not_repeated(self):
+        first = self.admin.get(RECORDS_URL, {'sort': 'register_no', 'page_size': 3}).json()
+        make_record(self.dataset, '24UAM000', 'UAM301')
+        second = self.admin.get(
+            RECORDS_URL, {'sort': 'register_no', 'page_size': 3, 'cursor': first['next_cursor']}
+        ).json()
+        self.assertEqual([row['register_no'] for row in second['data']], ['24UAM103', '24UAM104', '24UAM105'])
+
+    def test_rejects_cursor_of_another_sort(self):
+        cursor = self.admin.get(RECORDS_URL, {'sort': 'hall', 'page_size': 3}).json()['next_cursor']
+        response = self.admin.get(RECORDS_URL, {'sort': 'date', 'cursor': cursor})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Invalid cursor')
+
+    def test_rejects_malformed_parameters(self):
+        for params in ({'cursor': '!!'}, {'sort': 'name'}, {'page_size': '0'}, {'status': 'seated'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.admin.get(RECORDS_URL, params).status_code, 400)
+
+    def test_requires_admin(self):
+        self.assertEqual(self.client.get(RECORDS_URL).status_code, 403)
+
+
+class RecordChangesTests(ExamsTestCase):
+    """get_record_changes delta sync."""
+
+    def setUp(self):
+        super().setUp()
+        self.first = make_record(self.dataset, '24UAM101', 'UAM301')
+        self.second = make_record(self.dataset, '24UAM102', 'UAM301')
+        _records_changed(['24UAM101', '24UAM102'], [self.dataset.id])
+        self.since = self.admin.get(RECORDS_URL).json()['version']
+
+    def changes(self, since, **params):
+        response = self.admin.get(CHANGES_URL, dict(params, since=since))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_nothing_changed(self):
+        body = self.changes(self.since)
+        self.assertEqual((body['data'], body['deleted'], body['reset']), ([], [], False))
+        self.assertEqual(body['version'], self.since)
+
+    def test_updated_and_deleted_rows(self):
+        self.admin.put(
+            f'/api/admin/records/{self.first.record}/update/',
+            '{"exam_hall_number": "A1", "exam_seat_number": "4"}', content_type='application/json',
+        )
+        self.admin.delete(f'/api/admin/records/{self.second.record}/delete/')
+
+        body = self.changes(self.since)
+        self.assertEqual([(row['record'], row['exam_hall_number']) for row in body['data']], [(self.first.record, 'A1')])
+        self.assertEqual(body['deleted'], [self.second.record])
+        self.assertFalse(body['reset'])
+        self.assertEqual(self.changes(body['version'])['data'], [])
+
+    def test_large_delta_is_paged(self):
+        for i in range(5):
+            make_record(self.dataset, f'24UAM2{i}', 'UAM301')
+        _records_changed([f'24UAM2{i}' for i in range(5)], [self.dataset.id])
+
+        body = self.changes(self.since, page_size=2)
+        records = [row['record'] for row in body['data']]
+        while body['next_cursor']:
+            body = self.changes(self.since, page_size=2, cursor=body['next_cursor'])
+            records += [row['record'] for row in body['data']]
+        self.assertEqual(len(records), 5)
+        self.assertEqual(len(set(records)), 5)
+
+    def test_reset_after_the_dataset_was_cleared(self):
+        ExamRecord.objects.filter(dataset=self.dataset).delete()
+        _records_changed(['24UAM101', '24UAM102'], [self.dataset.id], reset=True)
+        make_record(self.dataset, '24UAM103', 'UAM301')
+        _records_changed(['24UAM103'], [self.dataset.id])
+
+        body = self.changes(self.since)
+        self.assertTrue(body['reset'])
+        self.assertEqual([row['register_no'] for row in body['data']], ['24UAM103'])
+        self.assertEqual(body['deleted'], [])
+
+    def test_client_ahead_of_the_server_gets_everything(self):
+        body = self.changes(self.since + 10)
+        self.assertTrue(body['reset'])
+        self.assertEqual(len(body['data']), 2)
+
+    def test_requires_since(self):
+        self.assertEqual(self.admin.get(CHANGES_URL).status_code, 400)
+        self.assertEqual(self.admin.get(CHANGES_URL, {'since': '-1'}).status_code, 400)
@@ -0,0 +1,75 @@
+import json
+from unittest import mock
+
+from django.test import RequestFactory, override_settings
+
+from exams.throttling import client_ip, take_token
+
+from .base import ExamsTestCase, make_record
+
+LOGIN_URL = '/api/student/login/'
+NOW = 1_700_000_000.0
+
+
+@mock.patch('exams.throttling.time.time', return_value=NOW)
+class TakeTokenTests(ExamsTestCase):
+
+    @override_settings(STUDENT_LOGIN_THROTTLE={'register_no': (0.5, 3)})
+    def test_admits_burst_per_window(self, now):
+        self.assertEqual([take_token('register_no', '24UAM101') for _ in range(3)], [0, 0, 0])
+        retry_after = take_token('register_no', '24UAM101')
+        self.assertGreater(retry_after, 0)
+        self.assertLessEqual(retry_after, 6)
+        # Other identities have their own window
+        self.assertEqual(take_token('register_no', '24UAM102'), 0)
+
+        now.return_value = NOW + 6
+        self.assertEqual(take_token('register_no', '24UAM101'), 0)
+
+    @override_settings(STUDENT_LOGIN_THROTTLE={'register_no': None})
+    def test_disabled_scope(self, now):
+        self.assertEqual([take_token('register_no', '24UAM101') for _ in range(100)], [0] * 100)
+        self.assertEqual(take_token('ip', '10.0.0.1'), 0)
+
+
+class ClientIpTests(ExamsTestCase):
+
+    def request(self, **meta):
+        return RequestFactory().get('/', REMOTE_ADDR='10.0.0.9', **meta)
+
+    def test_remote_addr_by_default(self):
+        self.assertEqual(client_ip(self.request(HTTP_X_FORWARDED_FOR='1.2.3.4')), '10.0.0.9')
+
+    @override_settings(STUDENT_LOGIN_IP_HEADER='HTTP_X_FORWARDED_FOR', STUDENT_LOGIN_PROXY_COUNT=1)
+    def test_trusted_proxy_header_ignores_client_supplied_entries(self):
+        request = self.request(HTTP_X_FORWARDED_FOR='6.6.6.6, 1.2.3.4')
+        self.assertEqual(client_ip(request), '1.2.3.4')
+        self.assertEqual(client_ip(self.request()), '10.0.0.9')
+
+    @override_settings(STUDENT_LOGIN_IP_HEADER='HTTP_X_FORWARDED_FOR', STUDENT_LOGIN_PROXY_COUNT=2)
+    def test_proxy_count(self):
+        self.assertEqual(client_ip(self.request(HTTP_X_FORWARDED_FOR='6.6.6.6, 1.2.3.4, 10.0.0.2')), '1.2.3.4')
+
+
+class LoginThrottleTests(ExamsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        make_record(self.dataset, '24UAM101', 'UAM301')
+
+    def login(self, register_no='24UAM101'):
+        body = json.dumps({'register_no': register_no, 'date_of_birth': '2003-01-02'})
+        return self.client.post(LOGIN_URL, body, content_type='application/json')
+
+    @override_settings(STUDENT_LOGIN_THROTTLE={'register_no': (0.01, 2)})
+    def test_register_no_limit(self):
+        self.assertEqual([self.login().status_code for _ in range(2)], [200, 200])
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(self.login('24UAM102').status_code, 404)
+
+    @override_settings(STUDENT_LOGIN_THROTTLE={'ip': (0.01, 2)})
+    def test_ip_limit_applies_before_the_body_is_read(self):
+        self.assertEqual([self.login(f'24UAM{i}').status_code for i in range(2)], [404, 404])
+        self.assertEqual(self.login().status_code, 429)
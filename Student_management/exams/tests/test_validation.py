@@ -0,0 +1,70 @@
+import csv
+import io
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from exams.models import ExamRecord, IngestJob
+
+from .base import ExamsTestCase, make_record
+
+UPLOAD_URL = '/api/admin/upload/'
+HEADER = 'register no,student name,course code,course title,exam date,exam session,hall,seat\n'
+UPLOAD = (
+    HEADER
+    + '24UAM101,Asha,UAM301,Algebra,2025-12-15,FN,A1,1\n'
+    + '24UAM102,,UAM301,Algebra,2025-12-15,FN,A1,2\n'
+    + '24-UAM103,Chitra,UAM301,Algebra,2025-12-15,FN,A1,3\n'
+    + '24UAM104,Devi,UAM301,Algebra,15th Dec,FN,,\n'
+    + '24UAM101,Asha,UAM301,Algebra,2025-12-15,FN,A1,1\n'
+    + '24UAM105,Ezhil,UAM301,Algebra,2025-12-15,FN,A1,9\n'
+)
+
+
+class DryRunTests(ExamsTestCase):
+    """upload_csv with dry_run=1 reports what the import would do and writes nothing."""
+
+    def setUp(self):
+        super().setUp()
+        # Holds seat A1-9 for the same exam slot
+        make_record(self.dataset, '24UAM900', 'UAM301', hall='A1', seat='9')
+
+    def dry_run(self, **fields):
+        upload = SimpleUploadedFile('marks.csv', UPLOAD.encode('utf-8'))
+        return self.admin.post(UPLOAD_URL, {'file': upload, 'dry_run': '1', **fields})
+
+    def test_json_report(self):
+        response = self.dry_run()
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertTrue(body['dry_run'])
+        self.assertFalse(body['valid'])
+        data = body['data']
+        self.assertEqual(data['rows'], 6)
+        self.assertEqual(data['invalid_rows'], 5)
+        self.assertEqual(data['valid_rows'], 1)
+        self.assertFalse(data['errors_truncated'])
+
+        errors = {(error['row'], error['field']): error['error'] for error in data['errors']}
+        self.assertEqual(errors[(3, 'student_name')], 'Missing; the row is skipped')
+        self.assertIn('alphanumeric', errors[(4, 'register_no')])
+        self.assertEqual(errors[(5, 'exam_date')], 'Unparseable date; the value is ignored')
+        self.assertEqual(errors[(6, 'course_code')], 'Duplicate of row 2; merged into it on import')
+        self.assertIn((7, 'exam_seat_number'), errors)
+
+        self.assertEqual(ExamRecord.objects.filter(dataset=self.dataset).count(), 1)
+        self.assertFalse(IngestJob.objects.exists())
+
+    def test_csv_report_lists_every_error(self):
+        response = self.dry_run(format='csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('marks_errors.csv', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual(rows[0], ['row', 'register_no', 'course_code', 'field', 'value', 'error'])
+        self.assertEqual(len(rows) - 1, self.dry_run().json()['data']['error_count'])
+
+    def test_clean_file_is_valid(self):
+        upload = SimpleUploadedFile('marks.csv', (HEADER + '24UAM101,Asha,UAM301,Algebra,2025-12-15,FN,A1,1\n').encode())
+        body = self.admin.post(UPLOAD_URL, {'file': upload, 'dry_run': 'true'}).json()
+        self.assertTrue(body['valid'])
+        self.assertEqual(body['data']['errors'], [])
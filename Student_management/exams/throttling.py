@@ -0,0 +1,79 @@
+"""
+Fixed-window throttling kept in the Django cache.
+
+A scope configured as (rate, burst) admits `burst` requests per window of
+burst / rate seconds, so the long-run rate is `rate` per second. Each window
+is one counter created with cache.add and bumped with cache.incr, both atomic
+in the local-memory, Memcached and Redis backends, so concurrent requests
+never spend the same slot. State lives only in the cache (no database
+writes), so a throttled request is rejected before it reaches the ORM. With a
+per-process cache every worker counts on its own.
+"""
+import math
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+THROTTLE_KEY_PREFIX = 'throttle'
+
+
+def throttle_rates(scope):
+    """(rate, burst) configured for a scope in STUDENT_LOGIN_THROTTLE, or None when disabled."""
+    return getattr(settings, 'STUDENT_LOGIN_THROTTLE', {}).get(scope)
+
+
+def client_ip(request):
+    """
+    Address the per-IP bucket is keyed on.
+
+    REMOTE_ADDR unless STUDENT_LOGIN_IP_HEADER names a request.META header
+    set by a trusted reverse proxy (e.g. 'HTTP_X_FORWARDED_FOR'). For a
+    comma-separated list the entry STUDENT_LOGIN_PROXY_COUNT places from the
+    right is used: the one the outermost trusted proxy appended, which the
+    client cannot forge.
+    """
+    header = getattr(settings, 'STUDENT_LOGIN_IP_HEADER', None)
+    if header:
+        addresses = [a.strip() for a in request.META.get(header, '').split(',') if a.strip()]
+        proxies = getattr(settings, 'STUDENT_LOGIN_PROXY_COUNT', 1)
+        if addresses:
+            return addresses[-min(proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR')
+
+
+def _window(scope, ident, rate, burst, now):
+    """Cache key of the current window, its lifetime and the seconds left in it."""
+    length = burst / rate
+    index = math.floor(now / length)
+    key = f'{THROTTLE_KEY_PREFIX}:{scope}:{ident}:{index}'
+    return key, math.ceil(length) + 1, (index + 1) * length - now
+
+
+def take_token(scope, ident):
+    """
+    Count one request against the (scope, ident) window.
+
+    Returns 0 when the request may proceed, otherwise the number of seconds
+    until the window resets.
+    """
+    rates = throttle_rates(scope)
+    if not rates or not ident:
+        return 0
+    rate, burst = rates
+    key, timeout, remaining = _window(scope, ident, rate, burst, time.time())
+    cache.add(key, 0, timeout)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr; start the window over
+        cache.add(key, 1, timeout)
+        count = 1
+    return 0 if count <= burst else remaining
+
+
+async def atake_token(scope, ident):
+    """Async variant of take_token."""
+    # The cache's own async incr is a get followed by a set, so run the atomic sync one
+    return await sync_to_async(take_token)(scope, ident)
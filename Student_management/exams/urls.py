@@ -1,11 +1,19 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Under ASGI the login form's own route can be served by the async view
+student_login = views.student_login_async if getattr(settings, 'STUDENT_LOGIN_ASYNC', False) else views.student_login
+
 urlpatterns = [
-    path('student/login/', views.student_login, name='student_login'),
+    path('student/login/', student_login, name='student_login'),
+    path('student/login/async/', views.student_login_async, name='student_login_async'),
+    path('student/seat/', views.student_seat, name='student_seat'),
     path('admin/login/', views.admin_login, name='admin_login'),
     path('admin/dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('admin/records/', views.get_all_records, name='get_all_records'),
+    path('admin/records/export/', views.export_records, name='export_records'),
+    path('admin/records/changes/', views.get_record_changes, name='get_record_changes'),
     path('admin/records/<int:record_id>/', views.get_record, name='get_record'),
     path('admin/records/create/', views.create_record, name='create_record'),
     path('admin/records/<int:record_id>/update/', views.update_record, name='update_record'),
@@ -14,7 +22,14 @@ urlpatterns = [
     path('admin/rooms/<int:room_id>/toggle/', views.toggle_room_status, name='toggle_room_status'),
     path('admin/rooms/add/', views.add_room, name='add_room'),
     path('admin/upload/', views.upload_csv, name='upload_csv'),
+    path('admin/upload/batch/', views.upload_batch, name='upload_batch'),
+    path('admin/upload/seating/', views.upload_seating_csv, name='upload_seating_csv'),
+    path('admin/upload/jobs/', views.get_ingest_jobs, name='get_ingest_jobs'),
+    path('admin/upload/jobs/<int:job_id>/', views.get_ingest_job, name='get_ingest_job'),
+    path('admin/upload/jobs/<int:job_id>/retry/', views.retry_ingest_job, name='retry_ingest_job'),
     path('admin/generate-seating/', views.generate_seating_api, name='generate_seating'),
     path('admin/refresh-allocation/', views.refresh_allocation, name='refresh_allocation'),
     path('admin/logout/', views.admin_logout, name='admin_logout'),
+    path('admin/datasets/<int:dataset_id>/active/', views.set_dataset_active, name='set_dataset_active'),
+    path('admin/datasets/<int:dataset_id>/publish/', views.publish_dataset, name='publish_dataset'),
 ]
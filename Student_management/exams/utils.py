@@ -2,6 +2,69 @@ import random
 from collections import defaultdict
 from .models import ExamRecord, Room
 
+def encode_columnar(fields, rows, dictionary_fields=()):
+    """
+    Encode row tuples as column arrays instead of a list of dicts.
+    
+    Each field becomes one array. Fields in dictionary_fields (repeating
+    strings such as course title, session or hall) are dictionary-encoded as
+    {'values': [distinct values], 'codes': [index into values per row]}.
+    """
+    columns = {}
+    for index, field in enumerate(fields):
+        column = [row[index] for row in rows]
+        if field in dictionary_fields:
+            positions = {}
+            codes = [positions.setdefault(value, len(positions)) for value in column]
+            column = {'values': list(positions), 'codes': codes}
+        columns[field] = column
+    return {'format': 'columnar', 'count': len(rows), 'columns': columns}
+
+
+def active_exam_records():
+    """Exam records of the active datasets, as student login reads them."""
+    return ExamRecord.objects.filter(dataset__is_active=True).order_by('exam_date', 'exam_session', 'record')
+
+
+# Forenoon sessions sort before afternoon ones on the same exam date
+SESSION_ORDER = {'FN': 0, 'MORNING': 0, 'AN': 1, 'AFTERNOON': 1}
+
+
+def student_login_payload(exam_records):
+    """
+    Serialize all of a student's ExamRecords into the student login payload.
+    
+    The top-level fields describe the student's earliest exam, past or not,
+    so the payload does not depend on the day it is cached or published
+    (kept for clients that show a single hall ticket; the student dashboard
+    picks the next exam from 'exams'). 'exams' holds the full timetable
+    ordered by exam date and session.
+    """
+    exam_records = sorted(exam_records, key=lambda r: (
+        r.exam_date,
+        SESSION_ORDER.get(r.exam_session.strip().upper(), 2),
+        r.exam_session,
+        r.record,
+    ))
+    exams = [{
+        'record': r.record,
+        'course_code': r.course_code,
+        'course_title': r.course_title,
+        'exam_date': r.exam_date.strftime('%Y-%m-%d'),
+        'exam_session': r.exam_session,
+        'exam_hall_number': r.exam_hall_number,
+        'exam_seat_number': r.exam_seat_number,
+    } for r in exam_records]
+    
+    first = exam_records[0]
+    return {
+        **exams[0],
+        'register_no': first.register_no,
+        'student_name': first.student_name,
+        'exams': exams,
+    }
+
+
 def shuffle_students(students):
     """
     Ordered alternating seating arrangement for exam halls.
@@ -85,13 +148,17 @@ def shuffle_students_for_room(students, departments):
     return shuffled
 
 
-def generate_seating_arrangement(selected_rooms):
+def generate_seating_arrangement(selected_rooms, dataset=None):
     """
     Allocates seats ensuring each room has only 2-3 departments maximum.
     Students from the same 2-3 departments alternate within each room.
+    When a dataset is given, only its pending students are allocated.
     """
     # Get all students that haven't been allocated yet
-    all_students = list(ExamRecord.objects.filter(exam_hall_number='Pending'))
+    pending = ExamRecord.objects.filter(exam_hall_number='Pending')
+    if dataset is not None:
+        pending = pending.filter(dataset=dataset)
+    all_students = list(pending)
     
     if not all_students:
         return {'total_allocated': 0, 'allocations': []}
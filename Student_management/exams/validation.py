@@ -0,0 +1,289 @@
+"""
+Dry-run validation of uploads.
+
+UploadValidator and SeatingValidator read a whole upload the same way
+upload_csv and upload_seating_csv do, but write nothing. They yield one
+REPORT_FIELDS tuple per problem, so a view can stream the report as CSV
+while the file is still being read. Problems found within the file come out
+in file order; seat collisions with records already stored in the dataset
+come out at the end, once the whole file has been seen.
+
+row is the row number a spreadsheet would show: the header is row 1, so the
+first data row is row 2 (multi-sheet workbooks count on across sheets).
+"""
+from .ingest import (
+    DATE_OF_BIRTH_FORMATS, EXAM_DATE_FORMATS, FIELDS, UPLOAD_COLUMN_ALIASES, UPLOAD_REQUIRED_FIELDS,
+    _date_column, _objects, _register_no_error, _text_column, resolve_columns,
+)
+from .models import ExamRecord
+
+REPORT_FIELDS = ('row', 'register_no', 'course_code', 'field', 'value', 'error')
+# Errors included in a JSON report; the CSV report has all of them
+REPORT_JSON_LIMIT = 1000
+# Register numbers looked up per query when validating a seating file
+LOOKUP_BATCH_SIZE = 1000
+DATE_FORMATS = {'exam_date': EXAM_DATE_FORMATS, 'date_of_birth': DATE_OF_BIRTH_FORMATS}
+
+
+def _too_long(field, value):
+    max_length = FIELDS[field].max_length
+    if max_length and len(value) > max_length:
+        return f'Longer than {max_length} characters'
+    return None
+
+
+def _assigned(hall, seat):
+    """Whether a hall/seat pair is a real seat rather than blank or 'Pending'."""
+    return hall and seat and hall.lower() != 'pending' and seat.lower() != 'pending'
+
+
+class _Validator:
+    """Counters shared by the validators; the report comes from check()."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.rows = 0
+        self.error_count = 0
+        self.invalid_rows = set()
+        # (exam_date, exam_session, hall, seat) -> (register_no, course_code, row) of the file row taking it,
+        # and the seats taken per key or register number, so a later row for it can move them
+        self.seats = {}
+        self.owned_seats = {}
+
+    def summary(self):
+        return {
+            'rows': self.rows,
+            'valid_rows': self.rows - len(self.invalid_rows),
+            'invalid_rows': len(self.invalid_rows),
+            'error_count': self.error_count,
+        }
+
+    def _error(self, row, register_no, course_code, field, value, error):
+        self.error_count += 1
+        if row is not None:
+            self.invalid_rows.add(row)
+        return (row, register_no, course_code, field, value, error)
+
+    def _take_seat(self, owner, slot, register_no, course_code, row):
+        """Claim a seat for a file row; returns the error if another student in the file has it."""
+        holder = self.seats.setdefault(slot, (register_no, course_code, row))
+        if holder[0] != register_no:
+            return (
+                f'Seat {slot[3]} in {slot[2]} ({slot[0]} {slot[1]}) is also given to {holder[0]} on row {holder[2]}'
+            )
+        self.owned_seats.setdefault(owner, []).append(slot)
+        return None
+
+    def _release_seats(self, owner):
+        """Free the seats an earlier row gave to owner, now that a later row re-seats it."""
+        for slot in self.owned_seats.pop(owner, []):
+            self.seats.pop(slot, None)
+
+    def _stored_collisions(self, moved):
+        """Yield errors for file seats already held by stored records the file leaves where they are."""
+        if not self.seats:
+            return
+        halls = {slot[2] for slot in self.seats}
+        stored = ExamRecord.objects.filter(dataset=self.dataset, exam_hall_number__in=halls).values_list(
+            'register_no', 'course_code', 'exam_date', 'exam_session', 'exam_hall_number', 'exam_seat_number'
+        )
+        for register_no, course_code, exam_date, exam_session, hall, seat in stored.iterator(chunk_size=2000):
+            if moved(register_no, course_code):
+                continue
+            holder = self.seats.get((exam_date, exam_session, hall, seat))
+            if holder and holder[0] != register_no:
+                yield self._error(
+                    holder[2], holder[0], holder[1], 'exam_seat_number', seat,
+                    f'Seat {seat} in {hall} ({exam_date} {exam_session}) is already held by '
+                    f'{register_no} ({course_code}) in the dataset'
+                )
+
+
+class UploadValidator(_Validator):
+    """
+    Validates a record upload (see upload_csv) given as the DataFrames from read_upload.
+
+    Reports rows the import would skip or fail (missing or invalid register
+    number, missing name or course code, over-long values), dates it would
+    drop as unparseable, keys repeated within the file (merged on import)
+    and seats given to two students for the same exam slot.
+    """
+
+    def __init__(self, dataset, aliases=UPLOAD_COLUMN_ALIASES, required=UPLOAD_REQUIRED_FIELDS):
+        super().__init__(dataset)
+        self.aliases = aliases
+        self.required = required
+        # (register_no, course_code) -> first row, and keys whose seat the file sets
+        self.keys = {}
+        self.seated_keys = set()
+
+    def check(self, frames):
+        """Yield the report for an upload's DataFrames, then the seat collisions with stored records."""
+        reported_headers = set()
+        for df in frames:
+            first_row = self.rows + 2
+            self.rows += len(df)
+            columns = resolve_columns(df.columns, self.aliases)
+            missing = [field for field in self.required if columns[field] is None]
+            if missing:
+                header = tuple(df.columns)
+                if header not in reported_headers:
+                    reported_headers.add(header)
+                    for field in missing:
+                        yield self._error(None, None, None, field, None, 'No column for this field; its rows are skipped')
+                self.invalid_rows.update(range(first_row, first_row + len(df)))
+                continue
+            yield from self._check_frame(df, columns, first_row)
+
+        yield from self._stored_collisions(lambda register_no, course_code: (register_no, course_code) in self.seated_keys)
+
+    def _check_frame(self, df, columns, first_row):
+        import pandas as pd
+
+        values, unparsed = {}, {}
+        for field, column in columns.items():
+            if column is None:
+                values[field] = [None] * len(df)
+                continue
+            if field in DATE_FORMATS:
+                parsed = _date_column(df[column], DATE_FORMATS[field])
+                values[field] = parsed.tolist()
+                # Date cells read as dates always parse; only text can be unparseable
+                if not pd.api.types.is_datetime64_any_dtype(df[column]):
+                    unparsed[field] = _objects(_text_column(df[column]).where(parsed.isna())).tolist()
+                continue
+            text = _text_column(df[column])
+            if field == 'register_no':
+                values[field] = _objects(text.str.upper()).tolist()
+            else:
+                values[field] = _objects(text).tolist()
+
+        names = list(values)
+        for offset, row_values in enumerate(zip(*(values[name] for name in names))):
+            row = first_row + offset
+            record = dict(zip(names, row_values))
+            register_no, course_code = record['register_no'], record['course_code']
+
+            for field in self.required:
+                if record[field] is None:
+                    yield self._error(row, register_no, course_code, field, None, 'Missing; the row is skipped')
+            if register_no is not None:
+                error = _register_no_error(register_no)
+                if error:
+                    yield self._error(
+                        row, register_no, course_code, 'register_no', register_no, f'{error}; the row is skipped'
+                    )
+            for field, value in record.items():
+                if isinstance(value, str):
+                    error = _too_long(field, value)
+                    if error:
+                        yield self._error(row, register_no, course_code, field, value, error)
+            for field, raw in unparsed.items():
+                if raw[offset] is not None:
+                    yield self._error(
+                        row, register_no, course_code, field, raw[offset], 'Unparseable date; the value is ignored'
+                    )
+
+            if register_no is None or course_code is None:
+                continue
+            key = (register_no, course_code)
+            first = self.keys.setdefault(key, row)
+            if first != row:
+                yield self._error(
+                    row, register_no, course_code, 'course_code', course_code,
+                    f'Duplicate of row {first}; merged into it on import'
+                )
+            hall, seat = record['exam_hall_number'], record['exam_seat_number']
+            if seat:
+                # A new seat replaces the one an earlier row gave this key
+                self.seated_keys.add(key)
+                self._release_seats(key)
+            if _assigned(hall, seat) and record['exam_date'] and record['exam_session']:
+                slot = (record['exam_date'], record['exam_session'], hall, seat)
+                error = self._take_seat(key, slot, register_no, course_code, row)
+                if error:
+                    yield self._error(row, register_no, course_code, 'exam_seat_number', seat, error)
+
+
+class SeatingValidator(_Validator):
+    """
+    Validates a seating upload (see upload_seating_csv) given as csv.DictReader rows.
+
+    Reports rows the import would skip (missing or invalid register number,
+    hall or seat), register numbers that are not in the dataset or repeated
+    in the file, and seats given to two students with an exam in the same
+    date and session, within the file or against stored records.
+    """
+
+    def __init__(self, dataset):
+        super().__init__(dataset)
+        # register_no -> first row
+        self.register_nos = {}
+
+    def check(self, rows):
+        """Yield the report for a seating file's rows, then the seat collisions with stored records."""
+        batch = []
+        for row, values in enumerate(rows, start=2):
+            self.rows += 1
+            batch.append((row, values))
+            if len(batch) >= LOOKUP_BATCH_SIZE:
+                yield from self._check_batch(batch)
+                batch = []
+        yield from self._check_batch(batch)
+
+        yield from self._stored_collisions(lambda register_no, course_code: register_no in self.register_nos)
+
+    def _check_batch(self, batch):
+        parsed = []
+        for row, values in batch:
+            # Same header normalization and aliases as upload_seating_csv
+            row_norm = {k.lower().replace('-', '_').replace(' ', '_').strip(): v for k, v in values.items() if k}
+            register_no = row_norm.get('register_no') or row_norm.get('roll_no') or row_norm.get('reg_no')
+            hall_no = row_norm.get('hall_no') or row_norm.get('hall_number') or row_norm.get('exam_hall') or row_norm.get('exam_hall_number')
+            seat_no = row_norm.get('seat_no') or row_norm.get('seat_number') or row_norm.get('exam_seat') or row_norm.get('exam_seat_number')
+            register_no = register_no.strip().upper() if register_no and register_no.strip() else None
+            hall_no = hall_no.strip() if hall_no and hall_no.strip() else None
+            seat_no = seat_no.strip() if seat_no and seat_no.strip() else None
+            parsed.append((row, register_no, hall_no, seat_no))
+
+        slots = {}
+        register_nos = {register_no for _, register_no, _, _ in parsed if register_no}
+        stored = ExamRecord.objects.filter(dataset=self.dataset, register_no__in=register_nos)
+        for register_no, exam_date, exam_session in stored.values_list('register_no', 'exam_date', 'exam_session'):
+            slots.setdefault(register_no, []).append((exam_date, exam_session))
+
+        for row, register_no, hall_no, seat_no in parsed:
+            if register_no is None:
+                yield self._error(row, None, None, 'register_no', None, 'Missing; the row is skipped')
+                continue
+            error = _register_no_error(register_no)
+            if error:
+                yield self._error(row, register_no, None, 'register_no', register_no, error)
+            for field, value in (('exam_hall_number', hall_no), ('exam_seat_number', seat_no)):
+                if value is None:
+                    yield self._error(row, register_no, None, field, None, 'Missing; the row is skipped')
+                else:
+                    error = _too_long(field, value)
+                    if error:
+                        yield self._error(row, register_no, None, field, value, error)
+
+            first = self.register_nos.setdefault(register_no, row)
+            if first != row:
+                yield self._error(
+                    row, register_no, None, 'register_no', register_no, f'Duplicate of row {first}; the later row wins'
+                )
+                self._release_seats(register_no)
+            student_slots = slots.get(register_no, [])
+            if not student_slots:
+                yield self._error(row, register_no, None, 'register_no', register_no, 'Not found in the dataset')
+            elif len(student_slots) > 1:
+                yield self._error(
+                    row, register_no, None, 'register_no', register_no,
+                    f'Matches {len(student_slots)} records; the import can only seat a student with one record'
+                )
+            if not _assigned(hall_no, seat_no):
+                continue
+            for exam_date, exam_session in student_slots:
+                error = self._take_seat(register_no, (exam_date, exam_session, hall_no, seat_no), register_no, None, row)
+                if error:
+                    yield self._error(row, register_no, None, 'exam_seat_number', seat_no, error)
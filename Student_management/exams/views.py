@@ -1,17 +1,83 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, condition
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
 from django.utils import timezone
+from django.utils.cache import patch_vary_headers
 from datetime import datetime
 import json
 import csv
 import io
-from .utils import generate_seating_arrangement
+import math
+import hashlib
+import base64
+import binascii
+import itertools
+import re
+from .utils import active_exam_records, generate_seating_arrangement, student_login_payload, encode_columnar
+from .responses import FastJsonResponse, dumps, serialize_rows
+from .cache import (
+    get_student_login, set_student_login, aget_student_login, aset_student_login,
+    invalidate_student_logins, get_seating_versions, invalidate_seating_versions,
+)
+from .throttling import take_token, atake_token, client_ip
+from .ingest import read_upload
+from .jobs import create_batch_job, create_job, submit as submit_ingest_job
+from .validation import REPORT_FIELDS, REPORT_JSON_LIMIT, SeatingValidator, UploadValidator
+from .snapshot import lookup_student_login, publish_dataset as publish_snapshot, discard_snapshot
 
-from .models import ExamRecord, Room, Dataset
+from .models import ExamRecord, Room, Dataset, RecordTombstone, IngestJob
+
+
+STAMP_BATCH_SIZE = 500
+
+
+def _records_changed(register_nos, dataset_ids, deleted=(), reset=False):
+    """
+    Bump the seating version of the written datasets, stamp the touched
+    students' rows with it for delta sync, and drop cached login payloads
+    and any published snapshot made stale by the write.
+    
+    Call after the write, so a delta client never sees the new version
+    before the rows it covers. deleted holds (record, register_no) pairs
+    removed from the datasets, kept as tombstones; reset marks the datasets'
+    records as cleared wholesale. Returns the version each existing dataset
+    was bumped to, by id.
+    """
+    dataset_ids = [d for d in dataset_ids if d is not None]
+    register_nos = list(set(register_nos))
+    versions = {}
+    with transaction.atomic():
+        for dataset_id in dataset_ids:
+            # The row lock taken here orders concurrent writers by version
+            Dataset.objects.filter(id=dataset_id).update(seating_version=F('seating_version') + 1)
+            version = Dataset.objects.filter(id=dataset_id).values_list('seating_version', flat=True).first()
+            if version is None:
+                continue
+            versions[dataset_id] = version
+            if reset:
+                Dataset.objects.filter(id=dataset_id).update(records_reset_version=version)
+                RecordTombstone.objects.filter(dataset_id=dataset_id).delete()
+                continue
+            for i in range(0, len(register_nos), STAMP_BATCH_SIZE):
+                ExamRecord.objects.filter(
+                    dataset_id=dataset_id, register_no__in=register_nos[i:i + STAMP_BATCH_SIZE]
+                ).update(change_version=version)
+            RecordTombstone.objects.bulk_create([
+                RecordTombstone(dataset_id=dataset_id, record=record, register_no=register_no, change_version=version)
+                for record, register_no in deleted
+            ])
+    invalidate_seating_versions()
+    invalidate_student_logins(register_nos)
+    discard_snapshot(dataset_ids)
+    return versions
 
 
 def admin_dashboard(request):
@@ -25,83 +91,240 @@ def admin_dashboard(request):
     return render(request, 'admin_dashboard.html')
 
 
+def _student_credentials(request):
+    """
+    Parse and validate the student login body.
+    
+    Returns (register_no, date_of_birth, None) or (None, None, error_response).
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return None, None, JsonResponse({
+            'success': False,
+            'error': 'Invalid JSON data'
+        }, status=400)
+    
+    return _parse_credentials(data)
+
+
+def _parse_credentials(data):
+    """Validate register number and date of birth from the login JSON body."""
+    register_no = data.get('register_no', '').strip().upper()
+    date_of_birth = data.get('date_of_birth', '')
+    
+    if not register_no or not date_of_birth:
+        return None, None, JsonResponse({
+            'success': False,
+            'error': 'Register Number and Date of Birth are required'
+        }, status=400)
+    
+    # Parse date of birth
+    try:
+        dob = datetime.strptime(date_of_birth, '%Y-%m-%d').date()
+    except ValueError:
+        return None, None, JsonResponse({
+            'success': False,
+            'error': 'Invalid date format. Use YYYY-MM-DD'
+        }, status=400)
+    
+    return register_no, dob, None
+
+
+SEAT_TOKEN_SALT = 'exams.student_seat'
+
+
+def _seat_token(register_no, dob):
+    """Signed token issued at login that lets the dashboard poll student_seat without resending credentials."""
+    return signing.dumps([register_no, dob.isoformat()], salt=SEAT_TOKEN_SALT)
+
+
+def _seat_credentials(request):
+    """
+    Read the seat token from the Authorization: Bearer header.
+    
+    Returns (register_no, date_of_birth, None) or (None, None, error_response).
+    """
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    max_age = getattr(settings, 'STUDENT_SEAT_TOKEN_MAX_AGE', 12 * 60 * 60)
+    try:
+        if scheme.lower() != 'bearer' or not token:
+            raise signing.BadSignature
+        register_no, date_of_birth = signing.loads(token.strip(), salt=SEAT_TOKEN_SALT, max_age=max_age)
+        dob = datetime.strptime(date_of_birth, '%Y-%m-%d').date()
+    except (signing.BadSignature, ValueError, TypeError):
+        return None, None, JsonResponse({
+            'success': False,
+            'error': 'Missing or expired seat token. Please log in again.'
+        }, status=401)
+    return register_no, dob, None
+
+
+def _too_many_requests(retry_after):
+    response = JsonResponse({
+        'success': False,
+        'error': 'Too many login attempts. Please wait and try again.'
+    }, status=429)
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def _student_timetable(register_no, dob):
+    """All of a student's exams in the active datasets, earliest first."""
+    return active_exam_records().filter(register_no=register_no, date_of_birth=dob)
+
+
+def _lookup_student(register_no, dob):
+    """
+    Return the timetable payload for a student, or None when not found.
+    
+    Served from the published seat snapshot, then the cache, before the database.
+    """
+    payload = lookup_student_login(register_no, dob)
+    if payload is not None:
+        return payload
+    payload = get_student_login(register_no, dob)
+    if payload is not None:
+        return payload
+    
+    # Fetch the student's whole timetable from the active datasets in one
+    # query (served by the idx_dataset_reg_dob composite index)
+    exam_records = list(_student_timetable(register_no, dob))
+    if not exam_records:
+        return None
+    
+    payload = student_login_payload(exam_records)
+    set_student_login(register_no, dob, payload)
+    return payload
+
+
+def _student_not_found():
+    return JsonResponse({
+        'success': False,
+        'error': 'No record found with the provided Register Number and Date of Birth'
+    }, status=404)
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def student_login(request):
     """Handle student login with Register Number and Date of Birth."""
     try:
-        data = json.loads(request.body)
-        register_no = data.get('register_no', '').strip().upper()
-        date_of_birth = data.get('date_of_birth', '')
+        retry_after = take_token('ip', client_ip(request))
+        if retry_after:
+            return _too_many_requests(retry_after)
         
-        if not register_no or not date_of_birth:
-            return JsonResponse({
-                'success': False,
-                'error': 'Register Number and Date of Birth are required'
-            }, status=400)
+        register_no, dob, error = _student_credentials(request)
+        if error:
+            return error
         
-        # Parse date of birth
-        try:
-            dob = datetime.strptime(date_of_birth, '%Y-%m-%d').date()
-        except ValueError:
-            return JsonResponse({
-                'success': False,
-                'error': 'Invalid date format. Use YYYY-MM-DD'
-            }, status=400)
+        retry_after = take_token('register_no', register_no)
+        if retry_after:
+            return _too_many_requests(retry_after)
         
-        # Query database for matching record
-        try:
-            exam_record = ExamRecord.objects.get(
-                register_no=register_no,
-                date_of_birth=dob
-            )
+        payload = _lookup_student(register_no, dob)
+        if payload is None:
+            return _student_not_found()
+        
+        # Return student data
+        return JsonResponse({'success': True, 'data': payload, 'seat_token': _seat_token(register_no, dob)})
             
-            # Return student data
-            return JsonResponse({
-                'success': True,
-                'data': {
-                    'record': exam_record.record,
-                    'register_no': exam_record.register_no,
-                    'student_name': exam_record.student_name,
-                    'course_code': exam_record.course_code,
-                    'course_title': exam_record.course_title,
-                    'exam_date': exam_record.exam_date.strftime('%Y-%m-%d'),
-                    'exam_session': exam_record.exam_session,
-                    'exam_hall_number': exam_record.exam_hall_number,
-                    'exam_seat_number': exam_record.exam_seat_number,
-                }
-            })
-        except ExamRecord.DoesNotExist:
-            return JsonResponse({
-                'success': False,
-                'error': 'No record found with the provided Register Number and Date of Birth'
-            }, status=404)
-        except ExamRecord.MultipleObjectsReturned:
-            # If multiple records exist, return the first one
-            exam_record = ExamRecord.objects.filter(
-                register_no=register_no,
-                date_of_birth=dob
-            ).first()
-            return JsonResponse({
-                'success': True,
-                'data': {
-                    'record': exam_record.record,
-                    'register_no': exam_record.register_no,
-                    'student_name': exam_record.student_name,
-                    'course_code': exam_record.course_code,
-                    'course_title': exam_record.course_title,
-                    'exam_date': exam_record.exam_date.strftime('%Y-%m-%d'),
-                    'exam_session': exam_record.exam_session,
-                    'exam_hall_number': exam_record.exam_hall_number,
-                    'exam_seat_number': exam_record.exam_seat_number,
-                }
-            })
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def student_login_async(request):
+    """
+    Async variant of student_login for ASGI deployments.
+    
+    Uses the async cache and ORM APIs so a waiting login does not hold a
+    worker thread while the lookup is in flight. Served at student/login/
+    itself when STUDENT_LOGIN_ASYNC is set.
+    """
+    try:
+        retry_after = await atake_token('ip', client_ip(request))
+        if retry_after:
+            return _too_many_requests(retry_after)
+        
+        register_no, dob, error = _student_credentials(request)
+        if error:
+            return error
+        
+        retry_after = await atake_token('register_no', register_no)
+        if retry_after:
+            return _too_many_requests(retry_after)
+        
+        # The snapshot stats its file (and re-maps it when replaced) off the event loop
+        cached = await sync_to_async(lookup_student_login)(register_no, dob)
+        if cached is None:
+            cached = await aget_student_login(register_no, dob)
+        if cached is not None:
+            return JsonResponse({'success': True, 'data': cached, 'seat_token': _seat_token(register_no, dob)})
+        
+        exam_records = [r async for r in _student_timetable(register_no, dob)]
+        if not exam_records:
+            return _student_not_found()
+        
+        payload = student_login_payload(exam_records)
+        await aset_student_login(register_no, dob, payload)
+        
+        return JsonResponse({'success': True, 'data': payload, 'seat_token': _seat_token(register_no, dob)})
             
-    except json.JSONDecodeError:
+    except Exception as e:
         return JsonResponse({
             'success': False,
-            'error': 'Invalid JSON data'
-        }, status=400)
+            'error': str(e)
+        }, status=500)
+
+
+def _student_seat_etag(request):
+    """
+    ETag for a student's seat lookup: changes whenever any active dataset's
+    seating version does, and is computed without loading exam records.
+    """
+    register_no, dob, error = _seat_credentials(request)
+    if error:
+        return None
+    versions = ','.join(f'{d}.{v}' for d, v in get_seating_versions())
+    return hashlib.sha1(f'{register_no}|{dob}|{versions}'.encode('utf-8')).hexdigest()
+
+
+@require_http_methods(["GET"])
+@condition(etag_func=_student_seat_etag)
+def student_seat(request):
+    """
+    GET-able student seat lookup for polling dashboards.
+    
+    Authenticated by the seat_token student_login returns, sent as
+    Authorization: Bearer, so credentials stay out of URLs and access logs;
+    repeat polls with If-None-Match receive 304 Not Modified until seating
+    changes.
+    """
+    try:
+        retry_after = take_token('ip', client_ip(request))
+        if retry_after:
+            return _too_many_requests(retry_after)
+        
+        register_no, dob, error = _seat_credentials(request)
+        if error:
+            return error
+        
+        payload = _lookup_student(register_no, dob)
+        if payload is None:
+            return _student_not_found()
+        
+        response = JsonResponse({'success': True, 'data': payload})
+        # Let browsers keep the body but revalidate with the ETag on every poll; shared
+        # caches must not store it, and the body differs per token on the same URL
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ['Authorization'])
+        return response
+    
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -152,13 +375,138 @@ def admin_login(request):
         }, status=500)
 
 
+RECORD_FIELDS = (
+    'record', 'register_no', 'student_name', 'course_code', 'course_title', 'exam_date',
+    'exam_session', 'exam_hall_number', 'exam_seat_number', 'date_of_birth',
+)
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# ?sort= keys for get_all_records; each ends in the primary key so the
+# keyset is unique, and each is backed by a (dataset, ...) index
+RECORD_SORTS = {
+    'date': ('-exam_date', 'register_no', 'record'),
+    'register_no': ('register_no', 'record'),
+    'hall': ('exam_hall_number', 'exam_seat_number', 'record'),
+    'course': ('course_code', 'register_no', 'record'),
+}
+DEFAULT_RECORD_SORT = 'date'
+
+# Repeating strings dictionary-encoded by ?format=columnar
+RECORD_DICTIONARY_FIELDS = ('course_code', 'course_title', 'exam_date', 'exam_session', 'exam_hall_number')
+ALLOCATION_FIELDS = ('register_no', 'room', 'seat')
+
+
+def _encode_cursor(sort, row):
+    """Opaque keyset cursor holding the sort key values of a serialized RECORD_FIELDS row."""
+    position = [sort]
+    for key in RECORD_SORTS[sort]:
+        value = row[RECORD_FIELDS.index(key.lstrip('-'))]
+        position.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(sort, cursor):
+    """Inverse of _encode_cursor; raises ValueError on a malformed or mismatched token."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if position[0] != sort or len(position) != len(RECORD_SORTS[sort]) + 1:
+            raise ValueError
+        values = {}
+        for key, value in zip(RECORD_SORTS[sort], position[1:]):
+            field = key.lstrip('-')
+            if field == 'exam_date':
+                value = datetime.strptime(value, '%Y-%m-%d').date()
+            elif field == 'record':
+                value = int(value)
+            else:
+                value = str(value)
+            values[field] = value
+        return values
+    except (TypeError, ValueError, IndexError, UnicodeError, binascii.Error) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def _after_cursor(sort, values):
+    """Q selecting the rows that come after the cursor position in the given sort."""
+    condition = Q()
+    equal = {}
+    for key in RECORD_SORTS[sort]:
+        field = key.lstrip('-')
+        lookup = f'{field}__lt' if key.startswith('-') else f'{field}__gt'
+        condition |= Q(**equal, **{lookup: values[field]})
+        equal[field] = values[field]
+    return condition
+
+
+def _filter_records(records, params):
+    """
+    Apply get_all_records query filters; raises ValueError on a bad value.
+    
+    hall, course_code, exam_session: exact match
+    exam_date: YYYY-MM-DD
+    status: 'pending' or 'allocated'
+    search: register number prefix
+    """
+    if params.get('hall'):
+        records = records.filter(exam_hall_number=params['hall'].strip())
+    if params.get('course_code'):
+        records = records.filter(course_code=params['course_code'].strip())
+    if params.get('exam_session'):
+        records = records.filter(exam_session=params['exam_session'].strip())
+    if params.get('exam_date'):
+        try:
+            exam_date = datetime.strptime(params['exam_date'], '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('Invalid exam_date. Use YYYY-MM-DD')
+        records = records.filter(exam_date=exam_date)
+    
+    status = params.get('status', '').strip().lower()
+    if status == 'pending':
+        records = records.filter(exam_hall_number='Pending')
+    elif status == 'allocated':
+        records = records.exclude(exam_hall_number='Pending')
+    elif status:
+        raise ValueError('status must be "pending" or "allocated"')
+    
+    if params.get('search'):
+        records = records.filter(register_no__startswith=params['search'].strip().upper())
+    return records
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def get_all_records(request):
-    """Get all exam records (Admin only)."""
+    """
+    Get exam records of the active dataset (Admin only), one page at a time.
+    
+    Filters: ?hall=, ?course_code=, ?exam_date=, ?exam_session=,
+    ?status=pending|allocated and ?search= (register number prefix).
+    ?sort= picks one of RECORD_SORTS (default: newest exam date first).
+    ?format=columnar returns column arrays instead of a list of row objects.
+    Keyset-paginated: pass the returned next_cursor back as ?cursor= with the
+    same filters and sort to fetch the following page, and ?page_size= (up to
+    MAX_PAGE_SIZE) to change the page length. The returned version is the
+    starting point for get_record_changes.
+    """
     if not request.user.is_authenticated or request.user.username != 'Kgkite':
         return JsonResponse({'error': 'Unauthorized'}, status=403)
     
+    try:
+        page_size = int(request.GET.get('page_size', DEFAULT_PAGE_SIZE))
+        if page_size < 1:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'page_size must be a positive integer'}, status=400)
+    page_size = min(page_size, MAX_PAGE_SIZE)
+    
+    sort = request.GET.get('sort', DEFAULT_RECORD_SORT)
+    if sort not in RECORD_SORTS:
+        return JsonResponse({
+            'success': False,
+            'error': f'sort must be one of: {", ".join(RECORD_SORTS)}'
+        }, status=400)
+    
     active_id = request.session.get('active_dataset_id')
     dataset = None
     if active_id:
@@ -171,25 +519,219 @@ def get_all_records(request):
         dataset = Dataset.objects.first() # Fallback to first if none active
 
     if not dataset:
-        return JsonResponse({'success': True, 'data': [], 'message': 'No datasets found'})
-        
-    records = ExamRecord.objects.filter(dataset=dataset).order_by('-exam_date', 'register_no')
-    data = [{
-        'record': r.record,
-        'register_no': r.register_no,
-        'student_name': r.student_name,
-        'course_code': r.course_code,
-        'course_title': r.course_title,
-        'exam_date': r.exam_date.strftime('%Y-%m-%d'),
-        'exam_session': r.exam_session,
-        'exam_hall_number': r.exam_hall_number,
-        'exam_seat_number': r.exam_seat_number,
-        'date_of_birth': r.date_of_birth.strftime('%Y-%m-%d') if r.date_of_birth else None,
-    } for r in records]
+        return JsonResponse({'success': True, 'data': [], 'next_cursor': None, 'message': 'No datasets found'})
     
-    return JsonResponse({
+    try:
+        records = _filter_records(ExamRecord.objects.filter(dataset=dataset), request.GET)
+        cursor = request.GET.get('cursor')
+        if cursor:
+            records = records.filter(_after_cursor(sort, _decode_cursor(sort, cursor)))
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    rows = list(records.order_by(*RECORD_SORTS[sort]).values_list(*RECORD_FIELDS)[:page_size + 1])
+    
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = _encode_cursor(sort, rows[-1])
+    
+    if request.GET.get('format') == 'columnar':
+        data = encode_columnar(RECORD_FIELDS, rows, RECORD_DICTIONARY_FIELDS)
+    else:
+        data = serialize_rows(RECORD_FIELDS, rows)
+    
+    return FastJsonResponse({
         'success': True, 
         'data': data, 
+        'next_cursor': next_cursor,
+        'page_size': page_size,
+        'version': dataset.seating_version,
+        'active_dataset': dataset.name
+    })
+
+
+EXPORT_CHUNK_SIZE = 2000
+# Header names understood by upload_csv, so an export can be re-imported
+EXPORT_CSV_HEADER = (
+    'Record', 'Register No', 'Student Name', 'Course Code', 'Course Title', 'Exam Date',
+    'Exam Session', 'Exam Hall Number', 'Exam Seat Number', 'Date of Birth',
+)
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+    def write(self, value):
+        return value
+
+
+def _export_rows(dataset):
+    """
+    Yield every row of a dataset as RECORD_FIELDS tuples, EXPORT_CHUNK_SIZE at a time.
+    
+    Seeks by primary key instead of holding one open cursor, because MySQL
+    drivers buffer a whole result set client-side even under .iterator().
+    """
+    records = ExamRecord.objects.filter(dataset=dataset).order_by('record')
+    last_record = 0
+    while True:
+        chunk = list(records.filter(record__gt=last_record).values_list(*RECORD_FIELDS)[:EXPORT_CHUNK_SIZE])
+        if not chunk:
+            return
+        yield from chunk
+        last_record = chunk[-1][0]
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def export_records(request):
+    """
+    Stream every record of the active dataset as NDJSON (default) or CSV (?format=csv).
+    
+    Rows are produced chunk by chunk, so memory use does not grow with the dataset.
+    """
+    if not request.user.is_authenticated or request.user.username != 'Kgkite':
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+    
+    export_format = request.GET.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return JsonResponse({'success': False, 'error': 'format must be "ndjson" or "csv"'}, status=400)
+    
+    active_id = request.session.get('active_dataset_id')
+    dataset = None
+    if active_id:
+        try:
+            dataset = Dataset.objects.get(id=active_id)
+        except Dataset.DoesNotExist:
+            pass
+    
+    if not dataset:
+        dataset = Dataset.objects.first()
+        if not dataset:
+            return JsonResponse({'success': False, 'error': 'No dataset available'}, status=400)
+    
+    if export_format == 'csv':
+        writer = csv.writer(_Echo())
+        lines = itertools.chain([writer.writerow(EXPORT_CSV_HEADER)], (writer.writerow(row) for row in _export_rows(dataset)))
+        content_type = 'text/csv'
+    else:
+        lines = (dumps(dict(zip(RECORD_FIELDS, row))) + b'\n' for row in _export_rows(dataset))
+        content_type = 'application/x-ndjson'
+    
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    filename = re.sub(r'[^A-Za-z0-9_-]+', '_', dataset.name).strip('_') or 'dataset'
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+def _encode_changes_cursor(until, row):
+    """Opaque cursor for get_record_changes: the version bound and the last (change_version, record)."""
+    position = [until, row[-1], row[0]]
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+
+def _decode_changes_cursor(cursor):
+    """Inverse of _encode_changes_cursor; raises ValueError on a malformed token."""
+    try:
+        until, change_version, record = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return int(until), int(change_version), int(record)
+    except (TypeError, ValueError, UnicodeError, binascii.Error) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def get_record_changes(request):
+    """
+    Rows of the active dataset created, modified or deleted since ?since=<version> (Admin only).
+    
+    Returns the changed rows, the ids of deleted rows and the version to pass
+    as ?since= next time. reset=true means the dataset was cleared after
+    `since`: drop every local row before applying the changes. Large deltas are
+    paged like get_all_records (?page_size=, ?cursor=); deleted ids come with
+    the first page, and ?format=columnar is supported.
+    """
+    if not request.user.is_authenticated or request.user.username != 'Kgkite':
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+    
+    try:
+        since = int(request.GET['since'])
+        if since < 0:
+            raise ValueError
+    except KeyError:
+        return JsonResponse({'success': False, 'error': 'Missing required parameter: since'}, status=400)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'since must be a non-negative integer'}, status=400)
+    
+    try:
+        page_size = int(request.GET.get('page_size', DEFAULT_PAGE_SIZE))
+        if page_size < 1:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'page_size must be a positive integer'}, status=400)
+    page_size = min(page_size, MAX_PAGE_SIZE)
+    
+    active_id = request.session.get('active_dataset_id')
+    dataset = None
+    if active_id:
+        try:
+            dataset = Dataset.objects.get(id=active_id)
+        except Dataset.DoesNotExist:
+            pass
+    
+    if not dataset:
+        dataset = Dataset.objects.first()
+        if not dataset:
+            return JsonResponse({'success': False, 'error': 'No dataset available'}, status=400)
+    
+    until = dataset.seating_version
+    records = ExamRecord.objects.filter(dataset=dataset)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            until, last_version, last_record = _decode_changes_cursor(cursor)
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        records = records.filter(
+            Q(change_version__gt=last_version) | Q(change_version=last_version, record__gt=last_record)
+        )
+    
+    # A client ahead of the server (e.g. after a restore) gets every row again
+    reset = since < dataset.records_reset_version or since > until
+    if since > until:
+        since = -1
+    
+    rows = list(
+        records.filter(change_version__gt=since, change_version__lte=until)
+        .order_by('change_version', 'record')
+        .values_list(*RECORD_FIELDS, 'change_version')[:page_size + 1]
+    )
+    
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = _encode_changes_cursor(until, rows[-1])
+    rows = [row[:-1] for row in rows]
+    
+    deleted = []
+    if not cursor and not reset:
+        deleted = list(RecordTombstone.objects.filter(
+            dataset=dataset, change_version__gt=since, change_version__lte=until
+        ).values_list('record', flat=True))
+    
+    if request.GET.get('format') == 'columnar':
+        data = encode_columnar(RECORD_FIELDS, rows, RECORD_DICTIONARY_FIELDS)
+    else:
+        data = serialize_rows(RECORD_FIELDS, rows)
+    
+    return FastJsonResponse({
+        'success': True,
+        'data': data,
+        'deleted': deleted,
+        'reset': reset,
+        'version': until,
+        'next_cursor': next_cursor,
+        'page_size': page_size,
         'active_dataset': dataset.name
     })
 
@@ -249,6 +791,7 @@ def create_record(request):
             exam_seat_number=data['exam_seat_number'],
             date_of_birth=date_of_birth,
         )
+        _records_changed([record.register_no], [record.dataset_id])
         
         return JsonResponse({
             'success': True,
@@ -270,6 +813,11 @@ def create_record(request):
             'success': False,
             'error': f'Invalid date format: {str(e)}'
         }, status=400)
+    except IntegrityError:
+        return JsonResponse({
+            'success': False,
+            'error': 'The dataset already has a record for this register number and course code'
+        }, status=409)
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -286,6 +834,7 @@ def update_record(request, record_id):
     
     try:
         record = ExamRecord.objects.get(record=record_id)
+        previous_register_no = record.register_no
         data = json.loads(request.body)
         
         # Update fields if provided
@@ -312,6 +861,7 @@ def update_record(request, record_id):
                 record.date_of_birth = None
         
         record.save()
+        _records_changed([previous_register_no, record.register_no], [record.dataset_id])
         
         return JsonResponse({
             'success': True,
@@ -330,6 +880,11 @@ def update_record(request, record_id):
             'success': False,
             'error': f'Invalid date format: {str(e)}'
         }, status=400)
+    except IntegrityError:
+        return JsonResponse({
+            'success': False,
+            'error': 'The dataset already has a record for this register number and course code'
+        }, status=409)
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -346,7 +901,9 @@ def delete_record(request, record_id):
     
     try:
         record = ExamRecord.objects.get(record=record_id)
+        deleted = [(record.record, record.register_no)]
         record.delete()
+        _records_changed([record.register_no], [record.dataset_id], deleted=deleted)
         
         return JsonResponse({
             'success': True,
@@ -399,10 +956,62 @@ def toggle_room_status(request, room_id):
         return JsonResponse({'success': False, 'error': 'Room not found'}, status=404)
 
 
+def _is_dry_run(request):
+    """Whether an upload asks to be validated only (dry_run=1 as a form field or query parameter)."""
+    value = request.POST.get('dry_run') or request.GET.get('dry_run') or ''
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def _dry_run_response(request, validator, errors, filename):
+    """
+    Answer a dry run with the validator's report: JSON with the counts and the
+    first REPORT_JSON_LIMIT errors, or every error streamed as CSV (format=csv)
+    while the file is being read.
+    """
+    report_format = (request.POST.get('format') or request.GET.get('format') or 'json').lower()
+    if report_format == 'csv':
+        response = StreamingHttpResponse(_report_lines(errors), content_type='text/csv')
+        stem = re.sub(r'[^A-Za-z0-9_-]+', '_', filename.rsplit('.', 1)[0]).strip('_') or 'upload'
+        response['Content-Disposition'] = f'attachment; filename="{stem}_errors.csv"'
+        return response
+
+    report = list(itertools.islice(errors, REPORT_JSON_LIMIT))
+    for _ in errors:
+        pass
+    summary = validator.summary()
+    return JsonResponse({
+        'success': True,
+        'dry_run': True,
+        'valid': summary['error_count'] == 0,
+        'message': f'Checked {summary["rows"]} rows: {summary["invalid_rows"]} with errors, nothing was written',
+        'data': {
+            **summary,
+            'errors': serialize_rows(REPORT_FIELDS, report),
+            'errors_truncated': summary['error_count'] > len(report),
+        }
+    })
+
+
+def _report_lines(errors):
+    """CSV lines of a dry-run report; a file that cannot be read ends the report with the reason."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(REPORT_FIELDS)
+    try:
+        for error in errors:
+            yield writer.writerow(error)
+    except Exception as e:
+        yield writer.writerow(('', '', '', '', '', f'Validation stopped: {str(e)}'))
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def upload_csv(request):
-    """Upload CSV or Excel and populate ExamRecords."""
+    """
+    Accept a CSV or Excel upload and queue a background job that populates ExamRecords.
+    
+    With dry_run=1 the whole file is validated instead and nothing is written
+    (see _dry_run_response for the report formats).
+    """
     if not request.user.is_authenticated or request.user.username != 'Kgkite':
         return JsonResponse({'error': 'Unauthorized'}, status=403)
     
@@ -436,204 +1045,186 @@ def upload_csv(request):
                     'error': 'Active dataset not found. Please select a dataset.'
                 }, status=400)
         
-        # Read file using pandas
-        import pandas as pd
-        import numpy as np
-        
-        try:
-            if filename.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
-        except Exception as e:
-            return JsonResponse({'success': False, 'error': f'Failed to read file: {str(e)}'}, status=400)
-            
-        # Replace NaN with None/Empty string
-        df = df.replace({np.nan: None})
+        if _is_dry_run(request):
+            validator = UploadValidator(dataset)
+            errors = validator.check(read_upload(uploaded_file, filename))
+            return _dry_run_response(request, validator, errors, uploaded_file.name)
         
-        created_count = 0
-        updated_count = 0
-        halls_found = {} # Dictionary to store hall_name -> max_seat
+        # 'staging' loads the rows into a staging table and merges them set-based
+        method = request.POST.get('method') or getattr(settings, 'INGEST_METHOD', IngestJob.BATCHED)
+        if method not in (IngestJob.BATCHED, IngestJob.STAGING):
+            return JsonResponse({'success': False, 'error': 'method must be batched or staging'}, status=400)
         
-        # Normalize column names to lowercase/strip for easier matching
-        df.columns = df.columns.str.strip().str.lower()
-        
-        # Helper to find column regardless of specific naming
-        def get_val(row, possible_names):
-            for name in possible_names:
-                name_lower = name.lower()
-                if name_lower in row:
-                    return row[name_lower]
-            return None
+        # The file is ingested by a background worker; poll the job for progress
+        job = create_job(dataset, uploaded_file, method)
+        if job.skipped:
+            return JsonResponse({
+                'success': True,
+                'message': f'File is identical to the last upload into dataset "{dataset.name}"; nothing changed',
+                'data': _ingest_job_data(job)
+            })
+        return JsonResponse({
+            'success': True,
+            'message': f'Upload queued as job {job.id}',
+            'data': _ingest_job_data(job)
+        }, status=202)
         
-        for index, row in df.iterrows():
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def upload_batch(request):
+    """
+    Accept several CSV/Excel files (repeated 'files' fields) and queue one job
+    that parses them in parallel, merges them on (register_no, course_code)
+    and writes the result in a single transaction. Later files win conflicts.
+    """
+    if not request.user.is_authenticated or request.user.username != 'Kgkite':
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+
+    uploaded_files = request.FILES.getlist('files')
+    if not uploaded_files:
+        return JsonResponse({'success': False, 'error': 'No files uploaded'}, status=400)
+
+    for uploaded_file in uploaded_files:
+        if not uploaded_file.name.lower().endswith(('.csv', '.xls', '.xlsx')):
+            return JsonResponse({
+                'success': False,
+                'error': f'File type not supported: {uploaded_file.name}. Please upload CSV or Excel files.'
+            }, status=400)
+
+    try:
+        active_id = request.session.get('active_dataset_id')
+        if not active_id:
+            dataset = Dataset.objects.first()
+            if not dataset:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'No dataset available. Please create a dataset first.'
+                }, status=400)
+            request.session['active_dataset_id'] = dataset.id
+        else:
             try:
-                # Extract fields with flexible column name matching
-                register_no = get_val(row, ['Register-No', 'Register No', 'Reg No', 'RegNo', 'Roll No', 'RollNo'])
-                student_name = get_val(row, ['Student Name', 'Name', 'StudentName'])
-                course_code = get_val(row, ['Course Code', 'CourseCode', 'Code'])
-                course_title = get_val(row, ['Course Title', 'CourseTitle', 'Title', 'Course Name'])
-                exam_date_str = get_val(row, ['Exam Date', 'ExamDate', 'Date'])
-                exam_session = get_val(row, ['Exam Session', 'ExamSession', 'Session'])
-                dob_str = get_val(row, ['Date of Birth', 'DOB', 'DateOfBirth', 'Birth Date'])
-                
-                # Skip if essential fields are missing
-                if not register_no or not student_name or not course_code:
-                    continue
-                
-                # Normalize register number
-                register_no = str(register_no).strip().upper()
-                
-                # Parse exam date
-                exam_date = None
-                if exam_date_str:
-                    try:
-                        if isinstance(exam_date_str, str):
-                            # Try different date formats
-                            for fmt in ['%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y', '%d/%m/%Y']:
-                                try:
-                                    exam_date = datetime.strptime(exam_date_str, fmt).date()
-                                    break
-                                except ValueError:
-                                    continue
-                        else:
-                            # Handle pandas datetime
-                            exam_date = pd.to_datetime(exam_date_str).date()
-                    except:
-                        pass
-                
-                # Parse date of birth
-                date_of_birth = None
-                if dob_str:
-                    try:
-                        if isinstance(dob_str, str):
-                            # Try different date formats
-                            for fmt in ['%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y', '%d/%m/%Y', '%d/%m/%y']:
-                                try:
-                                    date_of_birth = datetime.strptime(dob_str, fmt).date()
-                                    break
-                                except ValueError:
-                                    continue
-                        else:
-                            # Handle pandas datetime
-                            date_of_birth = pd.to_datetime(dob_str).date()
-                    except:
-                        pass
-                
-                # Check if record exists for this register_no in this dataset
-                existing = ExamRecord.objects.filter(
-                    register_no=register_no,
-                    course_code=course_code,
-                    dataset=dataset
-                ).first()
-                
-                # Extract hall and seat numbers (common for both Create and Update)
-                hall_val = get_val(row, ['ExamHallNumber', 'Exam Hall Number', 'Hall Number', 'Hall No', 'Exam Hall', 'Hall'])
-                seat_val = get_val(row, ['ExamSeatNumber', 'Exam Seat Number', 'Seat Number', 'Seat No', 'Exam Seat', 'Seat'])
-                
-                if existing:
-                    # Update existing record
-                    existing.student_name = student_name or existing.student_name
-                    existing.course_title = course_title or existing.course_title
-                    if exam_date:
-                        existing.exam_date = exam_date
-                    if exam_session:
-                        existing.exam_session = exam_session
-                    if date_of_birth:
-                        existing.date_of_birth = date_of_birth
-                    
-                    
-                    # Update seating if provided
-                    # If Seat Number is updated, we MUST also update Hall Number to ensure consistency.
-                    # If Hall is provided, use it. If not (and Seat is provided), reset Hall to 'Pending' (clearing stale system values).
-                    if seat_val:
-                         existing.exam_seat_number = seat_val
-                         existing.exam_hall_number = hall_val or 'Pending'
-                    elif hall_val:
-                         # Only Hall provided? Update it.
-                         existing.exam_hall_number = hall_val
-                        
-                    existing.save()
-                    updated_count += 1
-                else:
-                    # Create new record
-                    ExamRecord.objects.create(
-                        dataset=dataset,
-                        register_no=register_no,
-                        student_name=student_name or 'Unknown',
-                        course_code=course_code,
-                        course_title=course_title or 'Unknown',
-                        exam_date=exam_date or timezone.now().date(),
-                        exam_session=exam_session or 'FN',
-                        exam_hall_number=hall_val or 'Pending',
-                        exam_seat_number=seat_val or 'Pending',
-                        date_of_birth=date_of_birth
-                    )
-                    created_count += 1
-                    
-                # Track hall and seat for Room creation
-                if hall_val:
-                    current_seat = 0
-                    try:
-                        current_seat = int(seat_val) if seat_val and str(seat_val).isdigit() else 0
-                    except:
-                        pass
-                    
-                    if hall_val not in halls_found:
-                        halls_found[hall_val] = current_seat
-                    else:
-                        if current_seat > halls_found[hall_val]:
-                            halls_found[hall_val] = current_seat
-
-            except Exception as row_error:
-                # Log error but continue processing other rows
-                print(f"Error processing row {index}: {str(row_error)}")
-                continue
-        
-        # Create/Update Rooms from valid collected halls
-        new_rooms_count = 0
-        for hall_name, max_seat in halls_found.items():
-            if not hall_name or hall_name.lower() == 'pending':
-                continue
-                
-            # Default capacity to at least 30 if max_seat is small or 0, otherwise use max_seat
-            inferred_capacity = max(max_seat, 30)
-            
-            room, created = Room.objects.get_or_create(
-                room_number=hall_name,
-                defaults={
-                    'capacity': inferred_capacity,
-                    'is_available': True
-                }
-            )
-            if created:
-                new_rooms_count += 1
-            else:
-                # Optional: Update capacity if new data suggests larger room
-                if max_seat > room.capacity:
-                    room.capacity = max_seat
-                    room.save()
+                dataset = Dataset.objects.get(id=active_id)
+            except Dataset.DoesNotExist:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Active dataset not found. Please select a dataset.'
+                }, status=400)
+
+        method = request.POST.get('method') or getattr(settings, 'INGEST_METHOD', IngestJob.BATCHED)
+        if method not in (IngestJob.BATCHED, IngestJob.STAGING):
+            return JsonResponse({'success': False, 'error': 'method must be batched or staging'}, status=400)
 
+        job = create_batch_job(dataset, uploaded_files, method)
         return JsonResponse({
             'success': True,
-            'message': f'Upload complete. Created: {created_count}, Updated: {updated_count}, New Rooms: {new_rooms_count}',
-            'data': {
-                'created': created_count,
-                'updated': updated_count,
-                'dataset': dataset.name,
-                'new_rooms': new_rooms_count
-            }
-        })
+            'message': f'Batch upload of {len(uploaded_files)} files queued as job {job.id}',
+            'data': _ingest_job_data(job)
+        }, status=202)
+
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+def _ingest_job_data(job):
+    """Status and counters of an upload ingest job."""
+    return {
+        'id': job.id,
+        'dataset': job.dataset_id,
+        'filename': job.filename,
+        'status': job.status,
+        'method': job.method,
+        'rows_processed': job.rows_processed,
+        'rows_failed': job.rows_failed,
+        'rows_rejected': job.rows_rejected,
+        'created': job.records_created,
+        'updated': job.records_updated,
+        'unchanged': job.rows_unchanged,
+        'new_rooms': job.new_rooms,
+        'seconds': round(job.seconds, 3),
+        'rows_per_second': job.rows_per_second,
+        'error': job.error,
+        'skipped': job.skipped,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    }
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def get_ingest_jobs(request):
+    """List recent upload jobs, newest first (?status= to filter, ?limit= up to 100)."""
+    if not request.user.is_authenticated or request.user.username != 'Kgkite':
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+    
+    try:
+        try:
+            limit = int(request.GET.get('limit', 20))
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'limit must be an integer'}, status=400)
+        limit = max(1, min(limit, 100))
         
+        jobs = IngestJob.objects.order_by('-created_at', '-id')
+        status = request.GET.get('status')
+        if status:
+            jobs = jobs.filter(status=status)
+        
+        return JsonResponse({'success': True, 'data': [_ingest_job_data(job) for job in jobs[:limit]]})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def get_ingest_job(request, job_id):
+    """Progress of one upload job."""
+    if not request.user.is_authenticated or request.user.username != 'Kgkite':
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+    
+    try:
+        job = IngestJob.objects.get(id=job_id)
+        return JsonResponse({'success': True, 'data': _ingest_job_data(job)})
+    except IngestJob.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Job not found'}, status=404)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def retry_ingest_job(request, job_id):
+    """Queue a failed upload job again; it resumes after the rows already committed."""
+    if not request.user.is_authenticated or request.user.username != 'Kgkite':
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+    
+    try:
+        requeued = IngestJob.objects.filter(id=job_id, status=IngestJob.FAILED).update(
+            status=IngestJob.QUEUED, error=None, finished_at=None
+        )
+        job = IngestJob.objects.get(id=job_id)
+        if not requeued:
+            return JsonResponse({'success': False, 'error': f'Job is {job.status}, only failed jobs can be retried'}, status=409)
+        
+        submit_ingest_job(job.id)
+        return JsonResponse({
+            'success': True,
+            'message': f'Job {job.id} queued again',
+            'data': _ingest_job_data(job)
+        }, status=202)
+    except IngestJob.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Job not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def generate_seating_api(request):
-    """Trigger seating arrangement generation."""
+    """Trigger seating arrangement generation (?format=columnar for column-encoded allocations)."""
     if not request.user.is_authenticated or request.user.username != 'Kgkite':
         return JsonResponse({'error': 'Unauthorized'}, status=403)
     
@@ -660,6 +1251,7 @@ def generate_seating_api(request):
             
         # Pass dataset to utility function
         result = generate_seating_arrangement(selected_rooms, dataset=dataset)
+        _records_changed([a['register_no'] for a in result['allocations']], [dataset.id])
         
         # Fetch ALL allocated students to return to frontend (including pre-allocated from CSV)
         all_allocated = ExamRecord.objects.filter(
@@ -668,16 +1260,15 @@ def generate_seating_api(request):
             exam_hall_number='Pending'
         ).order_by('exam_hall_number', 'exam_seat_number')
         
-        allocations_data = [{
-            'register_no': r.register_no,
-            'room': r.exam_hall_number,
-            'seat': r.exam_seat_number
-        } for r in all_allocated]
+        allocations_data = list(all_allocated.values_list('register_no', 'exam_hall_number', 'exam_seat_number'))
         
-        result['allocations'] = allocations_data
+        if request.GET.get('format') == 'columnar':
+            result['allocations'] = encode_columnar(ALLOCATION_FIELDS, allocations_data, ('room',))
+        else:
+            result['allocations'] = serialize_rows(ALLOCATION_FIELDS, allocations_data)
         result['total_allocated'] = len(allocations_data)
         
-        return JsonResponse({
+        return FastJsonResponse({
             'success': True, 
             'message': f"Seating plan ready. Total students: {len(allocations_data)}",
             'data': result
@@ -689,7 +1280,7 @@ def generate_seating_api(request):
 @csrf_exempt
 @require_http_methods(["POST"])
 def refresh_allocation(request):
-    """Clear existing allocations and regenerate seating arrangement (Admin only)."""
+    """Clear existing allocations and regenerate seating arrangement (Admin only, ?format=columnar supported)."""
     if not request.user.is_authenticated or request.user.username != 'Kgkite':
         return JsonResponse({'error': 'Unauthorized'}, status=403)
     
@@ -709,15 +1300,18 @@ def refresh_allocation(request):
                  return JsonResponse({'success': False, 'error': 'No dataset available'}, status=400)
 
         # Step 1: Reset allocations ONLY for this dataset
+        register_nos = ExamRecord.objects.filter(dataset=dataset).values_list('register_no', flat=True).distinct()
         reset_count = ExamRecord.objects.filter(dataset=dataset).update(
             exam_hall_number='Pending',
-            exam_seat_number='Pending'
+            exam_seat_number='Pending',
+            row_hash=None
         )
         
         # Step 2: Get available rooms
         selected_rooms = list(Room.objects.filter(is_available=True))
         
         if not selected_rooms:
+            _records_changed(register_nos, [dataset.id])
             return JsonResponse({
                 'success': False, 
                 'error': 'No available rooms found for allocation'
@@ -725,6 +1319,7 @@ def refresh_allocation(request):
         
         # Step 3: Generate new seating arrangement for this dataset
         result = generate_seating_arrangement(selected_rooms, dataset=dataset)
+        _records_changed(register_nos, [dataset.id])
         
         # Fetch ALL allocated students (should be same as result for refresh, but good for consistency)
         all_allocated = ExamRecord.objects.filter(
@@ -733,15 +1328,14 @@ def refresh_allocation(request):
             exam_hall_number='Pending'
         ).order_by('exam_hall_number', 'exam_seat_number')
         
-        allocations_data = [{
-            'register_no': r.register_no,
-            'room': r.exam_hall_number,
-            'seat': r.exam_seat_number
-        } for r in all_allocated]
+        allocations_data = list(all_allocated.values_list('register_no', 'exam_hall_number', 'exam_seat_number'))
         
-        result['allocations'] = allocations_data
+        if request.GET.get('format') == 'columnar':
+            result['allocations'] = encode_columnar(ALLOCATION_FIELDS, allocations_data, ('room',))
+        else:
+            result['allocations'] = serialize_rows(ALLOCATION_FIELDS, allocations_data)
         
-        return JsonResponse({
+        return FastJsonResponse({
             'success': True,
             'message': f"Refreshed allocation. Total students: {len(allocations_data)}",
             'data': result
@@ -802,19 +1396,23 @@ def get_datasets(request):
     if not request.user.is_authenticated or request.user.username != 'Kgkite':
         return JsonResponse({'error': 'Unauthorized'}, status=403)
     
-    datasets = Dataset.objects.all()
+    # One grouped query instead of a COUNT per dataset
+    exam_type_labels = dict(Dataset._meta.get_field('exam_type').choices)
+    datasets = Dataset.objects.annotate(num_records=Count('records')).values_list(
+        'id', 'name', 'exam_type', 'created_at', 'is_active', 'num_records', 'description'
+    )
     data = [{
-        'id': d.id,
-        'name': d.name,
-        'exam_type': d.exam_type,
-        'exam_type_display': d.get_exam_type_display(),
-        'created_at': d.created_at.strftime('%Y-%m-%d %H:%M'),
-        'is_active': d.is_active,
-        'record_count': d.record_count,
-        'description': d.description or ''
-    } for d in datasets]
+        'id': dataset_id,
+        'name': name,
+        'exam_type': exam_type,
+        'exam_type_display': exam_type_labels.get(exam_type, exam_type),
+        'created_at': created_at.strftime('%Y-%m-%d %H:%M'),
+        'is_active': is_active,
+        'record_count': num_records,
+        'description': description or ''
+    } for dataset_id, name, exam_type, created_at, is_active, num_records, description in datasets]
     
-    return JsonResponse({'success': True, 'data': data})
+    return FastJsonResponse({'success': True, 'data': data})
 
 
 @csrf_exempt
@@ -899,7 +1497,9 @@ def refresh_dataset(request, dataset_id):
     try:
         dataset = Dataset.objects.get(id=dataset_id)
         deleted_count = dataset.records.count()
+        register_nos = list(dataset.records.values_list('register_no', flat=True).distinct())
         dataset.records.all().delete()
+        _records_changed(register_nos, [dataset.id], reset=True)
         
         return JsonResponse({
             'success': True,
@@ -921,7 +1521,9 @@ def delete_dataset(request, dataset_id):
     try:
         dataset = Dataset.objects.get(id=dataset_id)
         dataset_name = dataset.name
+        register_nos = list(dataset.records.values_list('register_no', flat=True).distinct())
         dataset.delete()
+        _records_changed(register_nos, [dataset_id])
         
         # Clear from session if it was active
         if request.session.get('active_dataset_id') == dataset_id:
@@ -986,7 +1588,7 @@ def get_active_dataset(request):
 @csrf_exempt
 @require_http_methods(["POST"])
 def upload_seating_csv(request):
-    """Upload CSV with pre-assigned seating and update ExamRecords."""
+    """Upload CSV with pre-assigned seating and update ExamRecords (dry_run=1 only validates it)."""
     if not request.user.is_authenticated or request.user.username != 'Kgkite':
         return JsonResponse({'error': 'Unauthorized'}, status=403)
     
@@ -1013,12 +1615,19 @@ def upload_seating_csv(request):
             if not dataset:
                  return JsonResponse({'success': False, 'error': 'No dataset available'}, status=400)
 
+        if _is_dry_run(request):
+            validator = SeatingValidator(dataset)
+            # Decoded as it is read, so large files are not held in memory
+            reader = csv.DictReader(io.TextIOWrapper(csv_file, encoding='UTF-8-sig'))
+            return _dry_run_response(request, validator, validator.check(reader), csv_file.name)
+
         data_set = csv_file.read().decode('UTF-8-sig') # Handle BOM
         io_string = io.StringIO(data_set)
         reader = csv.DictReader(io_string)
         
         updated_count = 0
         not_found_count = 0
+        updated_register_nos = []
         
         for row in reader:
             # Normalize row keys
@@ -1042,9 +1651,12 @@ def upload_seating_csv(request):
                     record.exam_hall_number = hall_no.strip()
                     record.exam_seat_number = seat_no.strip()
                     record.save()
+                    updated_register_nos.append(record.register_no)
                     updated_count += 1
                 except ExamRecord.DoesNotExist:
                     not_found_count += 1
+        
+        _records_changed(updated_register_nos, [dataset.id])
                     
         return JsonResponse({
             'success': True, 
@@ -1053,3 +1665,65 @@ def upload_seating_csv(request):
         
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def set_dataset_active(request, dataset_id):
+    """
+    Mark a dataset active or inactive. Student login only reads active
+    datasets, so deactivating past exams keeps them out of timetables and
+    out of the login lookup.
+    """
+    if not request.user.is_authenticated or request.user.username != 'Kgkite':
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+    
+    try:
+        data = json.loads(request.body)
+        is_active = data.get('is_active')
+        if not isinstance(is_active, bool):
+            return JsonResponse({'success': False, 'error': 'is_active must be true or false'}, status=400)
+        
+        dataset = Dataset.objects.get(id=dataset_id)
+        if dataset.is_active != is_active:
+            Dataset.objects.filter(id=dataset.id).update(is_active=is_active)
+            # Only the dataset's own students gain or lose exams; the published
+            # snapshot is built from every active dataset
+            invalidate_seating_versions()
+            invalidate_student_logins(dataset.records.values_list('register_no', flat=True).distinct())
+            discard_snapshot()
+        
+        return JsonResponse({
+            'success': True,
+            'message': f'Dataset "{dataset.name}" is now {"active" if is_active else "inactive"}',
+            'data': {'id': dataset.id, 'is_active': is_active}
+        })
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON data'}, status=400)
+    except Dataset.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Dataset not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def publish_dataset(request, dataset_id):
+    """Freeze a dataset's finished seating into the read-only login snapshot."""
+    if not request.user.is_authenticated or request.user.username != 'Kgkite':
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+    
+    try:
+        dataset = Dataset.objects.get(id=dataset_id)
+        student_count = publish_snapshot(dataset)
+        
+        return JsonResponse({
+            'success': True,
+            'message': f'Published seating for {student_count} students from dataset "{dataset.name}"'
+        })
+    except Dataset.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Dataset not found'}, status=404)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
@@ -7,13 +7,18 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'exam_portal.settings')
 django.setup()
 
-from exams.models import ExamRecord
+from exams.models import Dataset, ExamRecord
+from exams.views import _records_changed
 
 # Reset all students to Pending
+register_nos = list(ExamRecord.objects.values_list('register_no', flat=True).distinct())
 updated = ExamRecord.objects.all().update(
     exam_hall_number='Pending',
-    exam_seat_number='Pending'
+    exam_seat_number='Pending',
+    row_hash=None
 )
+# Drop cached logins and the published snapshot, which still show the old seats
+_records_changed(register_nos, Dataset.objects.values_list('id', flat=True))
 
 print(f"✅ Reset {updated} student records to Pending status")
 print(f"📊 Total students in database: {ExamRecord.objects.count()}")
@@ -14,6 +14,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'exam_portal.settings')
 django.setup()
 
 from exams.models import ExamRecord
+from exams.views import _records_changed
 
 print("=" * 80)
 print("SETTING DEFAULT DATE OF BIRTH FOR STUDENTS")
@@ -24,11 +25,16 @@ default_dob = date(2002, 1, 1)
 students = ExamRecord.objects.all()
 
 updated = 0
+register_nos, dataset_ids = set(), set()
 for student in students:
     if not student.date_of_birth:
         student.date_of_birth = default_dob
         student.save()
+        register_nos.add(student.register_no)
+        dataset_ids.add(student.dataset_id)
         updated += 1
+# Students can now log in with the default DOB; drop their cached logins and the snapshot
+_records_changed(register_nos, dataset_ids)
 
 print(f"\n✅ Updated {updated} students with default DOB: 2002-01-01")
 print(f"\n📝 Student Login Credentials:")
@@ -17,10 +17,11 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'exam_portal.settings')
 django.setup()
 
+from django.db import transaction
+from exams.ingest import RecordIngest, hall_seats, parse_upload, parsed_rows, upsert_rooms
 from exams.models import ExamRecord, Dataset
-from datetime import datetime
+from exams.views import _records_changed
 import pandas as pd
-import numpy as np
 
 # Path to your CSV file
 CSV_FILE = r"C:\Users\RANJITH KUMAR\OneDrive\Desktop\Exam-Management System\queryoutput_with_dob.csv"
@@ -44,179 +45,38 @@ def upload_csv():
     else:
         print(f"Using existing dataset: {dataset.name}")
         # Clear existing records
+        register_nos = list(dataset.records.values_list('register_no', flat=True).distinct())
         deleted = dataset.records.all().delete()
+        # Like refresh_dataset: drop cached logins and the published snapshot
+        _records_changed(register_nos, [dataset.id], reset=True)
         print(f"Deleted {deleted[0]} existing records")
     
-    # Normalize column names
-    df.columns = df.columns.str.strip().str.lower()
+    # Map headers and parse every column in one pass over the frame
+    parsed, rejected = parse_upload(df, required=('register_no',))
+    rows = parsed_rows(parsed)
     print(f"Columns: {list(df.columns)}")
+    print(f"Rows with a valid register number: {len(rows)} ({rejected} skipped)")
     
-    # Replace NaN with None
-    df = df.replace({np.nan: None})
+    with transaction.atomic():
+        ingest = RecordIngest(dataset)
+        for row in rows:
+            row['course_code'] = row['course_code'] or 'Unknown'
+            ingest.add(row)
+        summary = ingest.finish()
+    _records_changed(ingest.register_nos, [dataset.id])
     
-    created_count = 0
-    error_count = 0
-    halls_found = {}
+    created_count = summary['created']
+    error_count = summary['failed'] + rejected
     
-    
-    for index, row in df.iterrows():
-        try:
-            # Get register number
-            register_no = None
-            for col in ['registerno', 'register-no', 'register no', 'regno']:
-                if col in row and row[col]:
-                    register_no = str(row[col]).strip().upper()
-                    break
-            
-            if not register_no:
-                continue
-            
-            # Get student name
-            student_name = None
-            for col in ['studentname', 'student name', 'name']:
-                if col in row and row[col]:
-                    student_name = str(row[col]).strip()
-                    break
-            
-            # Get course code
-            course_code = None
-            for col in ['coursecode', 'course code', 'code']:
-                if col in row and row[col]:
-                    course_code = str(row[col]).strip()
-                    break
-            
-            # Get course title
-            course_title = None
-            for col in ['coursetitle', 'course title', 'title']:
-                if col in row and row[col]:
-                    course_title = str(row[col]).strip()
-                    break
-            
-            # Get exam date
-            exam_date = None
-            for col in ['examdate', 'exam date', 'date']:
-                if col in row and row[col]:
-                    try:
-                        exam_date_str = str(row[col])
-                        for fmt in ['%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y', '%d/%m/%Y']:
-                            try:
-                                exam_date = datetime.strptime(exam_date_str, fmt).date()
-                                break
-                            except ValueError:
-                                continue
-                        if not exam_date:
-                            exam_date = pd.to_datetime(row[col]).date()
-                    except:
-                        pass
-                    break
-            
-            # Get exam session
-            exam_session = None
-            for col in ['examsession', 'exam session', 'session']:
-                if col in row and row[col]:
-                    exam_session = str(row[col]).strip()
-                    break
-            
-            # Get DOB
-            date_of_birth = None
-            for col in ['dob', 'date of birth', 'dateofbirth', 'birth date']:
-                if col in row and row[col]:
-                    try:
-                        dob_str = str(row[col])
-                        for fmt in ['%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y', '%d/%m/%Y', '%d/%m/%y']:
-                            try:
-                                date_of_birth = datetime.strptime(dob_str, fmt).date()
-                                break
-                            except ValueError:
-                                continue
-                        if not date_of_birth:
-                            date_of_birth = pd.to_datetime(row[col]).date()
-                    except:
-                        pass
-                    break
-            
-            # Get Hall Number and Seat Number
-            exam_hall_number = None
-            for col in ['examhallnumber', 'hallnumber', 'hall number', 'hall no', 'exam hall', 'hall']:
-                if col in row and row[col]:
-                    exam_hall_number = str(row[col]).strip()
-                    break
-            
-            exam_seat_number = None
-            for col in ['examseatnumber', 'seatnumber', 'seat number', 'seat no', 'exam seat', 'seat']:
-                if col in row and row[col]:
-                    exam_seat_number = str(row[col]).strip()
-                    break
-
-            # Create record
-            ExamRecord.objects.create(
-                dataset=dataset,
-                register_no=register_no,
-                student_name=student_name or 'Unknown',
-                course_code=course_code or 'Unknown',
-                course_title=course_title or 'Unknown',
-                exam_date=exam_date or datetime.now().date(),
-                exam_session=exam_session or 'FN',
-                exam_hall_number=exam_hall_number or 'Pending',
-                exam_seat_number=exam_seat_number or 'Pending',
-                date_of_birth=date_of_birth
-            )
-            created_count += 1
-
-            if register_no == '711724UAM139':
-                print(f"DEBUG: Found 711724UAM139. Hall: '{exam_hall_number}', Seat: '{exam_seat_number}'")
-                
-            # Track hall and seat for Room creation
-            if exam_hall_number:
-                current_seat = 0
-                try:
-                    current_seat = int(exam_seat_number) if exam_seat_number and str(exam_seat_number).isdigit() else 0
-                except:
-                    pass
-                
-                if exam_hall_number not in halls_found:
-                    halls_found[exam_hall_number] = current_seat
-                else:
-                    if current_seat > halls_found[exam_hall_number]:
-                        halls_found[exam_hall_number] = current_seat
-            
-            if created_count % 50 == 0:
-                print(f"Processed {created_count} records...")
-                
-        except Exception as e:
-            error_count += 1
-            print(f"Error on row {index}: {str(e)}")
-            continue
-    
-    # Create/Update Rooms from valid collected halls
-    new_rooms_count = 0
-    from exams.models import Room  # Late import to avoid top-level circular issues if any
-    
-    for hall_name, max_seat in halls_found.items():
-        if not hall_name or hall_name.lower() == 'pending':
-            continue
-            
-        # Default capacity to at least 30, or max_seat
-        inferred_capacity = max(max_seat, 30)
-        
-        room, created = Room.objects.get_or_create(
-            room_number=hall_name,
-            defaults={
-                'capacity': inferred_capacity,
-                'is_available': True
-            }
-        )
-        if created:
-            new_rooms_count += 1
-            print(f"Created new room: {hall_name} (Cap: {inferred_capacity})")
-        else:
-            if max_seat > room.capacity:
-                room.capacity = max_seat
-                room.save()
+    # Create/Update Rooms from the highest seat per hall, in one pass over the Room table
+    new_rooms_count = upsert_rooms(hall_seats(parsed))
 
     print(f"\nUpload complete!")
     print(f"  Created: {created_count} records")
+    print(f"  Merged duplicates: {summary['updated']}")
+    print(f"  Unchanged: {summary['unchanged']}")
     print(f"  Errors: {error_count}")
+    print(f"  Speed: {summary['rows_per_second']} rows/sec")
     print(f"  Dataset: {dataset.name}")
     print(f"  New Rooms: {new_rooms_count}")
     
@@ -1,6 +1,6 @@
 "use client";
 import { useState, useEffect } from 'react';
-import { getRooms, toggleRoom, uploadCSV, generateSeating } from '../../services/api';
+import { getRooms, toggleRoom, uploadCSV, getUploadJob, generateSeating } from '../../services/api';
 
 export default function AdminDashboard() {
     const [rooms, setRooms] = useState([]);
@@ -37,6 +37,21 @@ export default function AdminDashboard() {
         try {
             const res = await uploadCSV(formData);
             setMessage(res.data.message || 'Upload successful');
+            // The file is ingested in the background; poll its job until it finishes
+            let job = res.data.data;
+            while (job.status === 'queued' || job.status === 'running') {
+                await new Promise((resolve) => setTimeout(resolve, 1000));
+                job = (await getUploadJob(job.id)).data.data;
+                setMessage(`Processing upload: ${job.rows_processed} rows`);
+            }
+            if (job.skipped) {
+                setMessage(res.data.message);
+            } else {
+                setMessage(job.status === 'succeeded'
+                    ? `Upload complete. Created: ${job.created}, Updated: ${job.updated}, Unchanged: ${job.unchanged}, New Rooms: ${job.new_rooms}`
+                    : `Upload failed: ${job.error}`);
+            }
+            fetchRooms();
         } catch (err) {
             setMessage('Upload failed');
         }
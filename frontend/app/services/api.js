@@ -16,12 +16,60 @@ export const toggleRoom = (id) => api.post(`/admin/rooms/${id}/toggle/`);
 export const uploadCSV = (formData) => api.post('/admin/upload/', formData, {
     headers: { 'Content-Type': 'multipart/form-data' }
 });
+// Uploads are ingested in the background: uploadCSV answers with the job in response.data.data;
+// poll getUploadJob(id) until its status is 'succeeded' or 'failed'.
+// With dry_run=1 in the form data nothing is written: the answer is the validation report
+// (add format=csv, and responseType 'blob', for the full per-row report as a CSV download).
+// Several files as one job (formData with repeated 'files' entries); later files win conflicting rows.
+export const uploadBatch = (formData) => api.post('/admin/upload/batch/', formData, {
+    headers: { 'Content-Type': 'multipart/form-data' }
+});
+export const getUploadJob = (id) => api.get(`/admin/upload/jobs/${id}/`);
+export const getUploadJobs = (status = null) => api.get('/admin/upload/jobs/', { params: status ? { status } : {} });
+export const retryUploadJob = (id) => api.post(`/admin/upload/jobs/${id}/retry/`);
+export const setDatasetActive = (id, is_active) => api.post(`/admin/datasets/${id}/active/`, { is_active });
 export const generateSeating = () => api.post('/admin/generate-seating/');
 export const refreshAllocation = () => api.post('/admin/refresh-allocation/');
-export const getRecords = () => api.get('/admin/records/');
+// Keyset-paginated: pass the previous response's next_cursor (with the same filters) to get the following page.
+// filters: { hall, course_code, exam_date, exam_session, status: 'pending'|'allocated', search, sort }
+export const getRecords = (cursor = null, pageSize = 500, filters = {}) => api.get('/admin/records/', {
+    params: cursor ? { ...filters, cursor, page_size: pageSize } : { ...filters, page_size: pageSize }
+});
+// Same page in the compact columnar encoding; decode response.data.data with decodeColumnar
+export const getRecordsColumnar = (cursor = null, pageSize = 500, filters = {}) =>
+    getRecords(cursor, pageSize, { ...filters, format: 'columnar' });
 
+// Rows changed since `since` (the version of a previous getRecords/getRecordChanges response),
+// with deleted record ids in response.data.deleted; response.data.reset means drop local rows first.
+export const getRecordChanges = (since, cursor = null, pageSize = 500) => api.get('/admin/records/changes/', {
+    params: cursor ? { since, cursor, page_size: pageSize } : { since, page_size: pageSize }
+});
+
+// Expand a ?format=columnar block ({ count, columns }) back into an array of row objects.
+// Dictionary-encoded columns arrive as { values, codes }.
+export const decodeColumnar = ({ count, columns }) => {
+    const fields = Object.keys(columns).map((name) => {
+        const column = columns[name];
+        return Array.isArray(column)
+            ? [name, (i) => column[i]]
+            : [name, (i) => column.values[column.codes[i]]];
+    });
+    const rows = new Array(count);
+    for (let i = 0; i < count; i++) {
+        const row = {};
+        for (const [name, get] of fields) row[name] = get(i);
+        rows[i] = row;
+    }
+    return rows;
+};
 
+// Answers with the timetable in response.data.data and a seat_token for getStudentSeat
 export const studentLogin = (register_no, date_of_birth) => api.post('/student/login/', { register_no, date_of_birth });
+// Conditional GET: the browser revalidates with the ETag and gets 304 until seating changes.
+// The token from studentLogin goes in a header, keeping credentials out of URLs; 401 once it expires.
+export const getStudentSeat = (seatToken) => api.get('/student/seat/', {
+    headers: { Authorization: `Bearer ${seatToken}` }
+});
 export const defaultParams = {};
 
 export default api;
@@ -1,6 +1,10 @@
 "use client";
 import { useEffect, useState } from 'react';
 import { useRouter } from 'next/navigation';
+import { getStudentSeat } from '../../services/api';
+
+// How often the dashboard checks for a changed seat; unchanged polls are answered with 304
+const SEAT_POLL_MS = 60 * 1000;
 
 export default function StudentDashboard() {
     const [student, setStudent] = useState(null);
@@ -15,8 +19,32 @@ export default function StudentDashboard() {
         }
     }, [router]);
 
+    useEffect(() => {
+        const seatToken = localStorage.getItem('studentSeatToken');
+        if (!seatToken) return;
+        const poll = async () => {
+            try {
+                const res = await getStudentSeat(seatToken);
+                if (res.data.success) {
+                    localStorage.setItem('studentData', JSON.stringify(res.data.data));
+                    setStudent(res.data.data);
+                }
+            } catch (err) {
+                // Expired token: keep showing the last seat; logging in again resumes polling
+                if (err.response?.status === 401) clearInterval(timer);
+            }
+        };
+        const timer = setInterval(poll, SEAT_POLL_MS);
+        poll();
+        return () => clearInterval(timer);
+    }, []);
+
     if (!student) return <div className="text-white text-center mt-20">Loading...</div>;
 
+    // The payload's top-level exam is the earliest one; show the first exam from today on
+    const today = new Date().toLocaleDateString('en-CA');
+    const exam = (student.exams || []).find((e) => e.exam_date >= today) || student;
+
     return (
         <div className="min-h-screen bg-black text-white p-6 flex flex-col items-center">
             <div className="w-full max-w-2xl">
@@ -41,29 +69,45 @@ export default function StudentDashboard() {
                     <div className="grid grid-cols-2 gap-4">
                         <div className="bg-white/5 p-4 rounded-xl">
                             <div className="text-gray-400 text-xs">Allocated Room</div>
-                            <div className="text-3xl font-bold text-green-400">{student.exam_hall_number || "Not Assigned"}</div>
+                            <div className="text-3xl font-bold text-green-400">{exam.exam_hall_number || "Not Assigned"}</div>
                         </div>
                         <div className="bg-white/5 p-4 rounded-xl">
                             <div className="text-gray-400 text-xs">Seat Number</div>
-                            <div className="text-3xl font-bold text-yellow-400">{student.exam_seat_number || "Wait"}</div>
+                            <div className="text-3xl font-bold text-yellow-400">{exam.exam_seat_number || "Wait"}</div>
                         </div>
                     </div>
 
                     <div className="mt-8 grid grid-cols-2 gap-4 text-sm">
                         <div>
-                            <span className="text-gray-500">Course:</span> <br />
-                            <span className="text-gray-300">{student.course_code} - {student.course_title}</span>
+                            <span className="text-gray-500">{exam === student ? 'Course:' : 'Next Exam:'}</span> <br />
+                            <span className="text-gray-300">{exam.course_code} - {exam.course_title}</span>
                         </div>
                         <div>
                             <span className="text-gray-500">Time:</span> <br />
-                            <span className="text-gray-300">{student.exam_date} ({student.exam_session})</span>
+                            <span className="text-gray-300">{exam.exam_date} ({exam.exam_session})</span>
                         </div>
                     </div>
+
+                    {student.exams && student.exams.length > 1 && (
+                        <div className="mt-8">
+                            <div className="text-gray-400 text-sm mb-3">Full Timetable</div>
+                            <div className="space-y-2">
+                                {student.exams.map((exam) => (
+                                    <div key={exam.record} className="bg-white/5 p-3 rounded-xl grid grid-cols-4 gap-2 text-sm">
+                                        <span className="text-gray-300">{exam.exam_date} ({exam.exam_session})</span>
+                                        <span className="text-gray-300 col-span-2">{exam.course_code} - {exam.course_title}</span>
+                                        <span className="text-green-400 text-right">{exam.exam_hall_number} / {exam.exam_seat_number}</span>
+                                    </div>
+                                ))}
+                            </div>
+                        </div>
+                    )}
                 </div>
 
                 <button
                     onClick={() => {
                         localStorage.removeItem('studentData');
+                        localStorage.removeItem('studentSeatToken');
                         router.push('/');
                     }}
                     className="mt-8 w-full text-gray-500 hover:text-white transition-colors"
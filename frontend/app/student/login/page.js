@@ -15,6 +15,7 @@ export default function StudentLogin() {
             const response = await studentLogin(regNo, dob);
             if (response.data.success) {
                 localStorage.setItem('studentData', JSON.stringify(response.data.data));
+                localStorage.setItem('studentSeatToken', response.data.seat_token);
                 router.push('/student/dashboard');
             } else {
                 setError(response.data.error || 'Login failed');